@@ -1,7 +1,7 @@
 import aiohttp
 import asyncio
 import re
-from typing import Dict, Optional, Any, List
+from typing import Dict, FrozenSet, Optional, Any, List
 try:
     from ..utils.logging import get_logger
 except ImportError:
@@ -13,26 +13,65 @@ except ImportError:
     # Fallback für direkte Ausführung
     from api.queries import GraphQLQueries
 from datetime import datetime, timezone, timedelta
+import json
 import os
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# GraphQL responses (series, rankings, athletes) can be large: decode them with orjson when available
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Encode obj as UTF-8 JSON bytes (orjson when available, same options as the backend caches)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode("utf-8")
 print(f"Lade Client.py von: {os.path.abspath(__file__)}")
 
 
 logger = get_logger(__name__)
 
+# Series lists per (organisation, year range) change a few times per season;
+# memoize them across requests and client instances
+_SERIES_CACHE: Dict[tuple, tuple] = {}
+# One lock per key so concurrent misses share a single upstream fetch
+_SERIES_CACHE_LOCKS: Dict[tuple, asyncio.Lock] = {}
+SERIES_CACHE_TTL_SECONDS = int(os.getenv("SERIES_CACHE_TTL_SECONDS", "3600"))
+# Optional Redis mirror of the same lists, so freshly started workers skip the fetch
+SERIES_REDIS_TTL_SECONDS = int(os.getenv("SERIES_REDIS_TTL_SECONDS", "86400"))
+
 class GraphQLClient:
     """Base GraphQL client for Liveheats API interactions."""
     
-    def __init__(self, base_url: str = "https://liveheats.com/api/graphql"):
+    def __init__(self, base_url: str = "https://liveheats.com/api/graphql", keep_alive: bool = False):
         self.base_url = base_url
         self._session: Optional[aiohttp.ClientSession] = None
+        self._users = 0  # Overlapping 'async with' blocks share one session
+        # keep_alive: keep the session (and its connection pool) open after the last
+        # 'async with' block exits; close() must then be called explicitly
+        self._keep_alive = keep_alive
         
     async def __aenter__(self):
-        self._session = aiohttp.ClientSession()
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        self._users += 1
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._users -= 1
+        if self._users == 0 and not self._keep_alive:
+            await self.close()
+
+    async def close(self):
+        """Close the underlying HTTP session."""
         if self._session:
             await self._session.close()
+            self._session = None
             
     async def execute(self, query: str, variables: Dict[str, Any] = None) -> Dict:
         """Execute a GraphQL query."""
@@ -54,7 +93,7 @@ class GraphQLClient:
                     logger.error(f"Response: {response_text}")
                     return None
                     
-                data = await response.json()
+                data = _json_loads(await response.read())
                 if "errors" in data:
                     logger.error(f"GraphQL Error: {data['errors']}")
                     return None
@@ -68,10 +107,14 @@ class GraphQLClient:
 class LiveheatsClient:
     """Specialized client for Liveheats API operations."""
     
-    def __init__(self):
-        self.client = GraphQLClient()
+    def __init__(self, keep_alive: bool = False):
+        self.client = GraphQLClient(keep_alive=keep_alive)
         self.queries = GraphQLQueries()
-        self.athlete_details = {}  # Cache für Athleten-Details
+        # No per-event state here: one instance is shared by every request (get_liveheats_client)
+
+    async def close(self):
+        """Close the underlying GraphQL session."""
+        await self.client.close()
         
     @staticmethod
     def _normalize_series_name(series_name: str) -> str:
@@ -81,8 +124,24 @@ class LiveheatsClient:
             return series_name
         return re.sub(r'\b(20[0-9]{2})-(20[0-9]{2})\b', r'\2', series_name, count=1)
 
+    @staticmethod
+    def event_athlete_details(event_result: Dict) -> Dict[str, Dict]:
+        """Details (incl. BIB and status) of the confirmed and waitlisted athletes of a get_event_athletes result."""
+        athlete_details = {}
+        for division in (event_result.get("event") or {}).get("eventDivisions") or ():
+            for entry in division.get("entries") or ():
+                if entry.get("status") in ["confirmed", "waitlisted"]:
+                    athlete = entry["athlete"]
+                    # Erweitere Athleten-Details um BIB und Status
+                    athlete_details[athlete["id"]] = {
+                        **athlete,
+                        "bib": entry.get("bib"),
+                        "status": entry["status"]
+                    }
+        return athlete_details
+
     async def get_event_athletes(self, event_id: str) -> Dict:
-        """Fetch athletes for a specific event and cache their details."""
+        """Fetch athletes for a specific event."""
         async with self.client as client:
             result = await client.execute(
                 self.queries.GET_EVENT_ATHLETES,
@@ -93,21 +152,6 @@ class LiveheatsClient:
                 logger.error(f"Keine Event-Daten gefunden für ID: {event_id}")
                 return None
 
-            # Cache athlete details from event
-            for division in result["event"]["eventDivisions"]:
-                for entry in division["entries"]:
-                    if entry["status"] in ["confirmed", "waitlisted"]:
-                        athlete = entry["athlete"]
-                        athlete_id = athlete["id"]
-                        # Erweitere Athleten-Details um BIB und Status
-                        self.athlete_details[athlete_id] = {
-                            **athlete,
-                            "bib": entry.get("bib"),
-                            "status": entry["status"]
-                        }
-                        logger.debug(f"Cached athlete details: {athlete['name']} (ID: {athlete_id})")
-
-            logger.info(f"Cached details for {len(self.athlete_details)} athletes")
             return result
 
     async def get_event_live_scoring(self, event_id: str) -> Optional[Dict]:
@@ -216,15 +260,25 @@ class LiveheatsClient:
             
             return [series["id"] for series in relevant_series]
         
-    async def fetch_multiple_series(self, series_ids: List[str], athlete_ids: List[str]) -> list:
-        """Fetch rankings data for multiple series and create uniform data structure for all athletes."""
+    async def fetch_multiple_series(self, series_ids: List[str], athlete_ids: List[str],
+                                    athlete_details: Optional[Dict[str, Dict]] = None) -> list:
+        """
+        Fetch rankings data for multiple series and create uniform data structure for all athletes.
+
+        Athletes without any results are listed under 'New Athletes' when their
+        details are passed in athlete_details (see event_athlete_details).
+        """
+        athlete_details = athlete_details or {}
+        # Ranking rows are filtered by membership, so look ids up in a set rather than a list
+        athlete_id_set = frozenset(athlete_ids)
+
         async with self.client as client:
             # Track processed athletes
             processed_athletes = set()
             
             # Create tasks for all series
             tasks = [
-                self._process_series(client, series_id, athlete_ids)
+                self._process_series(client, series_id, athlete_id_set)
                 for series_id in series_ids
             ]
             
@@ -242,7 +296,7 @@ class LiveheatsClient:
                             processed_athletes.add(ranking['athlete']['id'])
             
             # Find athletes without any results
-            athletes_without_results = set(athlete_ids) - processed_athletes
+            athletes_without_results = athlete_id_set - processed_athletes
             
             if athletes_without_results:
                 logger.info(f"Gefunden: {len(athletes_without_results)} Athleten ohne Ergebnisse")
@@ -257,7 +311,7 @@ class LiveheatsClient:
                 # Füge jeden Athleten ohne Ergebnisse hinzu
                 for athlete_id in athletes_without_results:
                     # Hole gespeicherte Athleten-Details
-                    athlete_data = self.athlete_details.get(athlete_id)
+                    athlete_data = athlete_details.get(athlete_id)
                     if athlete_data:
                         empty_ranking = {
                             'athlete': {
@@ -284,18 +338,62 @@ class LiveheatsClient:
             logger.info(f"Verarbeitet: {len(valid_results)} Series")
             logger.info(f"Gefundene Athleten insgesamt: {total_athletes}")
             
-            if total_athletes != len(self.athlete_details):
-                logger.warning(
-                    f"Warnung: Anzahl verarbeiteter Athleten ({total_athletes}) "
-                    f"weicht von gecachten Athleten ({len(self.athlete_details)}) ab"
-                )
-            
             return valid_results
         
-    async def get_series_by_years(self, short_name: str = "fwtglobal", years: range = range(2008, 2031)) -> list:
-        """Fetch series from an organisation and filter by year."""
+    async def get_series_by_years(self, short_name: str = "fwtglobal", years: range = range(2008, 2031),
+                                  redis_client=None) -> list:
+        """
+        Fetch series from an organisation and filter by year (cached for SERIES_CACHE_TTL_SECONDS).
+
+        With a redis_client, process cache misses are served from (and refill) a
+        shared Redis copy kept for SERIES_REDIS_TTL_SECONDS.
+        """
+        cache_key = (short_name.lower(), years.start, years.stop)
+        cached = _SERIES_CACHE.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            return list(cached[1])
+
+        lock = _SERIES_CACHE_LOCKS.setdefault(cache_key, asyncio.Lock())
+        async with lock:
+            # Another request may have filled the cache while we waited
+            cached = _SERIES_CACHE.get(cache_key)
+            if cached and cached[0] > time.monotonic():
+                return list(cached[1])
+
+            redis_key = f"series:{cache_key[0]}:{years.start}-{years.stop - 1}"
+            filtered_series = None
+            if redis_client:
+                try:
+                    cached_json = await redis_client.get(redis_key)
+                    if cached_json:
+                        filtered_series = _json_loads(cached_json)
+                except Exception as e:
+                    logger.warning(f"Redis read failed for {redis_key}: {e}")
+
+            if not filtered_series:
+                filtered_series = await self._fetch_series_by_years(short_name, years)
+                if redis_client and filtered_series:
+                    try:
+                        await redis_client.setex(redis_key, SERIES_REDIS_TTL_SECONDS, _json_dumps(filtered_series))
+                    except Exception as e:
+                        logger.warning(f"Redis write failed for {redis_key}: {e}")
+
+            if filtered_series:
+                _SERIES_CACHE[cache_key] = (time.monotonic() + SERIES_CACHE_TTL_SECONDS, filtered_series)
+        return list(filtered_series)
+
+    async def _fetch_series_by_years(self, short_name: str, years: range) -> list:
+        """Fetch series from an organisation (plus IFSA) and filter by year."""
         async with self.client as client:
-            result = await client.execute(self.queries.GET_ORGANISATION_SERIES, {"shortName": short_name})
+            # Query the organisation and IFSA concurrently
+            if short_name.lower() != "ifsa":
+                result, ifsa_result = await asyncio.gather(
+                    client.execute(self.queries.GET_ORGANISATION_SERIES, {"shortName": short_name}),
+                    client.execute(self.queries.GET_ORGANISATION_SERIES, {"shortName": "IFSA"})
+                )
+            else:
+                result = await client.execute(self.queries.GET_ORGANISATION_SERIES, {"shortName": short_name})
+                ifsa_result = None
             
             if not result or "organisationByShortName" not in result:
                 logger.error(f"Keine Organisation gefunden mit ShortName: {short_name}")
@@ -312,16 +410,14 @@ class LiveheatsClient:
                 if match and int(match.group(1)) in years:
                     filtered_series.append(s)
             
-            if short_name.lower() != "ifsa":
-                ifsa_result = await client.execute(self.queries.GET_ORGANISATION_SERIES, {"shortName": "IFSA"})
-                if ifsa_result and "organisationByShortName" in ifsa_result:
-                    ifsa_series = ifsa_result["organisationByShortName"].get("series", [])
-                    logger.info(f"{len(ifsa_series)} Serien von IFSA gefunden.")
+            if ifsa_result and "organisationByShortName" in ifsa_result:
+                ifsa_series = ifsa_result["organisationByShortName"].get("series", [])
+                logger.info(f"{len(ifsa_series)} Serien von IFSA gefunden.")
 
-                    for s in ifsa_series:
-                        match = re.search(r'\b(20(?:0[8-9]|1[0-9]|2[0-9]|30))\b', s["name"])
-                        if match and int(match.group(1)) in years:
-                            filtered_series.append(s)
+                for s in ifsa_series:
+                    match = re.search(r'\b(20(?:0[8-9]|1[0-9]|2[0-9]|30))\b', s["name"])
+                    if match and int(match.group(1)) in years:
+                        filtered_series.append(s)
 
             logger.info(f"{len(filtered_series)} Serien in den Jahren {years} gefunden (inkl. IFSA).")
             return filtered_series
@@ -402,7 +498,7 @@ class LiveheatsClient:
         # Hole ALLE Events aus den Serien (inkl. vergangene)
         return await self.get_events_from_series(series_ids, include_past=True)
             
-    async def _process_series(self, client: GraphQLClient, series_id: str, athlete_ids: List[str]) -> Optional[Dict]:
+    async def _process_series(self, client: GraphQLClient, series_id: str, athlete_ids: FrozenSet[str]) -> Optional[Dict]:
         """Process a single series and its divisions."""
         try:
             if not series_id or series_id.lower() == "id":
@@ -579,3 +675,26 @@ class LiveheatsClient:
             logger.debug(f"Error fetching series {series_id}: {e}")
 
         return athletes
+
+
+# Shared client for the API server: one aiohttp session (and connection pool) per process
+_shared_client: Optional[LiveheatsClient] = None
+
+
+async def get_liveheats_client() -> LiveheatsClient:
+    """Return the process-wide LiveheatsClient, creating it on first use.
+
+    Async so FastAPI resolves it on the event loop rather than in the threadpool.
+    """
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = LiveheatsClient(keep_alive=True)
+    return _shared_client
+
+
+async def close_liveheats_client():
+    """Close the shared client's session (call on application shutdown)."""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.close()
+        _shared_client = None
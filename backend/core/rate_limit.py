@@ -0,0 +1,35 @@
+"""
+Rate Limiting - the slowapi limiter shared by the app and its routers.
+
+When REDIS_URL is set, counters live in Redis (fixed window: one INCR + EXPIRE
+per hit) so all uvicorn workers enforce a single shared limit. Without it, or
+while Redis is unreachable, limits are tracked in process memory.
+
+slowapi's storage is synchronous: with Redis, each rate-limited request makes
+one blocking round trip on the event loop. That is the price of a limit shared
+across workers; keep the limiter on the few endpoints that need it.
+"""
+
+import os
+
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+
+def create_limiter() -> Limiter:
+    """Create a Limiter backed by Redis when REDIS_URL is configured."""
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        # Nothing connects here; in_memory_fallback_enabled covers Redis being unreachable later
+        return Limiter(
+            key_func=get_remote_address,
+            storage_uri=redis_url,
+            strategy="fixed-window",
+            in_memory_fallback_enabled=True,
+        )
+
+    return Limiter(key_func=get_remote_address)
+
+
+# One limiter (and storage connection) per process, imported by every router that rate limits
+limiter = create_limiter()
@@ -0,0 +1,100 @@
+"""
+Response Classes - JSON responses shared by routers returning large or cached payloads.
+"""
+
+import gzip
+import hashlib
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+
+from backend.core.serialization import GZIP_MAGIC
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson encodes much faster than stdlib json; fall back if it's not installed
+FastJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+
+def cached_json_response(body, max_age: int) -> Response:
+    """Serve an already-encoded JSON cache entry as-is, without decoding and re-encoding it."""
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={max_age}"}
+    )
+
+
+def accepts_gzip(request: Request) -> bool:
+    """Whether the client's Accept-Encoding allows gzip (an explicit q=0 refuses it)."""
+    qualities = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value.strip())
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+
+    quality = qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0)))
+    return quality > 0
+
+
+def cached_gzip_json_response(request: Request, body: bytes, max_age: int) -> Response:
+    """
+    Serve a cache entry that may have been stored by gzip_cache_value.
+
+    Compressed entries go out with Content-Encoding: gzip to clients that
+    accept it (GZipMiddleware leaves them alone); other clients get them inflated.
+    Pass the returned response to with_etag together with the ETag of the
+    uncompressed body, so both encodings carry the same tag.
+    """
+    if not body.startswith(GZIP_MAGIC):
+        return cached_json_response(body, max_age)
+    if not accepts_gzip(request):
+        return cached_json_response(gzip.decompress(body), max_age)
+
+    response = cached_json_response(body, max_age)
+    response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag for an encoded response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def with_etag(request: Request, response: Response, etag: Optional[str] = None) -> Response:
+    """
+    Tag a rendered response with an ETag of its body.
+
+    Returns a bodyless 304 instead when the client's If-None-Match already
+    holds that tag, so repeat polls skip the download. Pass etag when it was
+    computed alongside a cached body to skip re-hashing.
+    """
+    if etag is None:
+        etag = body_etag(response.body)
+    response.headers["ETag"] = etag
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        client_tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in client_tags or "*" in client_tags:
+            headers = {"ETag": etag}
+            if "cache-control" in response.headers:
+                headers["Cache-Control"] = response.headers["cache-control"]
+            return Response(status_code=304, headers=headers)
+
+    return response
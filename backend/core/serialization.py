@@ -0,0 +1,44 @@
+"""
+JSON Serialization - fast dumps/loads for Redis cache payloads and Supabase responses.
+"""
+
+import os
+import gzip
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Encoded cache entries at least this large are stored gzip-compressed
+GZIP_CACHE_MIN_BYTES = int(os.getenv("GZIP_CACHE_MIN_BYTES", "65536"))
+
+
+if orjson is not None:
+    def json_dumps(obj: Any) -> bytes:
+        """Encode obj as UTF-8 JSON bytes."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    json_loads = orjson.loads
+else:
+    def json_dumps(obj: Any) -> bytes:
+        """Encode obj as UTF-8 JSON bytes."""
+        return json.dumps(obj).encode("utf-8")
+
+    json_loads = json.loads
+
+
+def gzip_cache_value(body: bytes) -> bytes:
+    """
+    Gzip a large encoded payload before it is written to Redis.
+
+    Bodies under GZIP_CACHE_MIN_BYTES are returned as-is. mtime is pinned so
+    equal payloads compress to equal bytes (and equal ETags).
+    """
+    if len(body) < GZIP_CACHE_MIN_BYTES:
+        return body
+    return gzip.compress(body, compresslevel=5, mtime=0)
@@ -1,10 +1,15 @@
 # Database module - Supabase, Redis
 from .supabase import SupabaseClient
-from .cache import get_redis_client, cached_response, invalidate_cache, invalidate_cache_pattern
+from .cache import create_redis_client, get_redis_client, get_with_ttl, cache_write, cache_write_many, refill_lock, cached_response, invalidate_cache, invalidate_cache_pattern
 
 __all__ = [
     'SupabaseClient',
+    'create_redis_client',
     'get_redis_client',
+    'get_with_ttl',
+    'cache_write',
+    'cache_write_many',
+    'refill_lock',
     'cached_response',
     'invalidate_cache',
     'invalidate_cache_pattern',
@@ -4,59 +4,162 @@ Redis Cache Utilities
 Provides unified caching patterns to eliminate code duplication.
 """
 
-import json
+import os
+import time
+import asyncio
 import logging
-from typing import Any, Callable, Optional, TypeVar
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from backend.core.responses import FastJSONResponse, cached_json_response
+from backend.core.serialization import json_dumps
+
+try:
+    import redis.asyncio as redis_async
+except ImportError:
+    redis_async = None
 
 logger = logging.getLogger(__name__)
 
+# Per-key refill locks: [lock, number of requests holding or waiting on it]
+_REFILL_LOCKS: Dict[str, List] = {}
+
+# Seconds between reconnect attempts while Redis is unreachable
+REDIS_RETRY_SECONDS = int(os.getenv("REDIS_RETRY_SECONDS", "30"))
+
 T = TypeVar('T')
 
 
-async def get_redis_client(request: Request):
+async def create_redis_client():
     """
-    Get Redis client from app state, with lazy initialization.
+    Create the shared Redis client with a bounded connection pool.
 
-    Returns None if Redis is not available.
+    Called once per worker at startup (and again by get_redis_client while Redis
+    is unreachable); returns None if Redis is not available.
     """
-    # Check if already initialized
-    if hasattr(request.app.state, "_redis_client") and request.app.state._redis_client is not None:
-        return request.app.state._redis_client
-
-    # Try to import and connect
-    try:
-        import redis.asyncio as redis_async
-    except ImportError:
-        request.app.state._redis_client = None
+    if redis_async is None:
         return None
 
-    import os
     redis_url = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+    max_connections = int(os.getenv("REDIS_MAX_CONNECTIONS", "64"))
 
+    client = None
     try:
-        client = redis_async.from_url(redis_url, decode_responses=True)
+        # Values are encoded JSON: keep them as bytes so cache hits are served without a decode
+        client = redis_async.from_url(
+            redis_url,
+            decode_responses=False,
+            max_connections=max_connections,
+            health_check_interval=30,
+        )
         # Validate connectivity
-        pong = await client.ping()
-        if pong:
-            request.app.state._redis_client = client
+        if await client.ping():
             logger.info(f"Redis connected: {redis_url}")
             return client
     except Exception as e:
         logger.warning(f"Redis connection failed: {e}")
 
-    request.app.state._redis_client = None
+    if client is not None:
+        try:
+            await client.aclose()
+        except Exception:
+            pass
     return None
 
 
+async def get_redis_client(request: Request):
+    """
+    Get the shared Redis client from app state.
+
+    While Redis is unreachable, one request every REDIS_RETRY_SECONDS tries to
+    connect again; the others run uncached. Returns None if Redis is not available.
+    """
+    state = request.app.state
+    client = getattr(state, "_redis_client", None)
+    if client is not None or redis_async is None:
+        return client
+
+    now = time.monotonic()
+    if now < getattr(state, "_redis_retry_at", 0.0):
+        return None
+    # Claim this attempt before awaiting, so concurrent requests don't all reconnect
+    state._redis_retry_at = now + REDIS_RETRY_SECONDS
+    state._redis_client = await create_redis_client()
+    return state._redis_client
+
+
+async def get_with_ttl(redis_client, cache_key: str) -> Tuple[Optional[bytes], int]:
+    """
+    Fetch a cached value and its remaining TTL in a single Redis round trip.
+
+    Returns:
+        (value or None, TTL in seconds; negative if the key is missing or has no expiry)
+    """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        value, ttl_remaining = await pipe.get(cache_key).ttl(cache_key).execute()
+    return value, ttl_remaining
+
+
+async def cache_write(redis_client, cache_key: str, ttl_seconds: int, payload: Any) -> None:
+    """
+    Write a cache entry, logging instead of raising on failure.
+
+    Meant to run as a background task after the response is sent; payload is
+    encoded here unless it is already bytes.
+    """
+    try:
+        body = payload if isinstance(payload, bytes) else json_dumps(payload)
+        await redis_client.setex(cache_key, ttl_seconds, body)
+    except Exception as e:
+        logger.warning(f"Redis write failed for {cache_key}: {e}")
+
+
+async def cache_write_many(redis_client, ttl_seconds: int, entries: Dict[str, bytes]) -> None:
+    """Write several encoded cache entries with one TTL in a single pipelined round trip."""
+    if not entries:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for cache_key, body in entries.items():
+                pipe.setex(cache_key, ttl_seconds, body)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Redis write failed for {', '.join(entries)}: {e}")
+
+
+@asynccontextmanager
+async def refill_lock(redis_client, cache_key: str):
+    """
+    Serialize refills of one Redis cache key within this worker.
+
+    Concurrent misses wait for the first request to refill the entry, then
+    re-read it instead of each calling upstream. Without Redis there is
+    nothing to re-read, so nothing is locked.
+    """
+    if redis_client is None:
+        yield
+        return
+
+    entry = _REFILL_LOCKS.get(cache_key)
+    if entry is None:
+        entry = _REFILL_LOCKS[cache_key] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _REFILL_LOCKS[cache_key]
+
+
 async def cached_response(
     request: Request,
     cache_key: str,
     fetch_func: Callable[[], Any],
     ttl_seconds: int = 3600,
     force_refresh: bool = False,
-) -> JSONResponse:
+) -> FastJSONResponse:
     """
     Generic caching wrapper for API responses.
 
@@ -71,7 +174,7 @@ async def cached_response(
         force_refresh: Skip cache and fetch fresh data
 
     Returns:
-        JSONResponse with appropriate Cache-Control headers
+        FastJSONResponse with appropriate Cache-Control headers
 
     Usage:
         @app.get("/api/events")
@@ -91,13 +194,11 @@ async def cached_response(
     # Try Redis cache first
     if redis_client and not force_refresh:
         try:
-            cached_json = await redis_client.get(cache_key)
-            if cached_json:
-                payload = json.loads(cached_json)
-                ttl_remaining = await redis_client.ttl(cache_key)
-                if payload is not None and ttl_remaining and ttl_remaining > 0:
-                    response = JSONResponse(content=payload)
-                    response.headers["Cache-Control"] = f"public, max-age={int(ttl_remaining)}"
+            cached_json, ttl_remaining = await get_with_ttl(redis_client, cache_key)
+            # Cache entries are stored as encoded JSON: serve them without a decode/encode round trip
+            if cached_json and cached_json != b"null":
+                if ttl_remaining and ttl_remaining > 0:
+                    response = cached_json_response(cached_json, int(ttl_remaining))
                     response.headers["X-Cache"] = "HIT-REDIS"
                     return response
         except Exception as e:
@@ -116,7 +217,7 @@ async def cached_response(
             cached_data, cached_ts = cached_entry
             age = now_ts - cached_ts
             if age < ttl_seconds:
-                response = JSONResponse(content=cached_data)
+                response = FastJSONResponse(content=cached_data)
                 response.headers["Cache-Control"] = f"public, max-age={max(ttl_seconds - age, 0)}"
                 response.headers["X-Cache"] = "HIT-MEMORY"
                 return response
@@ -127,7 +228,7 @@ async def cached_response(
     # Store in Redis if available
     if redis_client:
         try:
-            await redis_client.setex(cache_key, ttl_seconds, json.dumps(payload))
+            await redis_client.setex(cache_key, ttl_seconds, json_dumps(payload))
         except Exception as e:
             logger.warning(f"Redis write failed for {cache_key}: {e}")
             # Fall back to memory cache
@@ -136,7 +237,7 @@ async def cached_response(
         # Use memory cache
         cache_store[cache_key] = (payload, now_ts)
 
-    response = JSONResponse(content=payload)
+    response = FastJSONResponse(content=payload)
     response.headers["Cache-Control"] = f"public, max-age={ttl_seconds}"
     response.headers["X-Cache"] = "MISS"
     return response
@@ -11,8 +11,26 @@ from typing import Optional, Any, Dict, List, Union
 import httpx
 from fastapi import HTTPException
 
+from backend.core.serialization import json_loads
+
 logger = logging.getLogger(__name__)
 
+# Compiled once: runs on every string value written to the database
+_SCRIPT_TAG_RE = re.compile(r'<script[^>]*>.*?</script>', re.IGNORECASE | re.DOTALL)
+
+
+def _is_identifier(name: str) -> bool:
+    """True for [a-zA-Z_][a-zA-Z0-9_]* names; checked for every table, column and filter key."""
+    return isinstance(name, str) and name.isascii() and name.isidentifier()
+
+
+def _quote_filter_value(value: Any) -> str:
+    """Quote a value for PostgREST in.(...) and or=(...) lists."""
+    if isinstance(value, (int, float)):
+        return str(value)
+    s = str(value).replace('"', '\\"')
+    return f'"{s}"'
+
 
 class SupabaseClient:
     """
@@ -29,6 +47,23 @@ class SupabaseClient:
 
         self.url = url.rstrip('/')
         self.key = key  # This is the anon key for public access
+        self._table_urls: Dict[str, str] = {}  # Validated table name -> REST URL
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client; keeps Supabase connections alive across requests."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+        return self._http
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client (call on application shutdown)."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
 
     def _get_headers(self, user_token: Optional[str] = None) -> Dict[str, str]:
         """Get headers for Supabase request, preferring user token for RLS."""
@@ -49,12 +84,20 @@ class SupabaseClient:
 
     def _validate_table_name(self, table: str) -> None:
         """Validate table name to prevent injection."""
-        if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', table):
+        if not _is_identifier(table):
             raise ValueError("Invalid table name")
 
+    def _table_url(self, table: str) -> str:
+        """Get the REST URL for a table, validating each table name only once."""
+        url = self._table_urls.get(table)
+        if url is None:
+            self._validate_table_name(table)
+            url = self._table_urls[table] = f"{self.url}/rest/v1/{table}"
+        return url
+
     def _validate_filter_key(self, key: str) -> None:
         """Validate filter key to prevent injection."""
-        if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', key):
+        if not _is_identifier(key):
             raise ValueError(f"Invalid filter key: {key}")
 
     def _validate_on_conflict(self, on_conflict: str) -> None:
@@ -62,7 +105,7 @@ class SupabaseClient:
         # Split by comma and validate each column name
         columns = [col.strip() for col in on_conflict.split(',')]
         for col in columns:
-            if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', col):
+            if not _is_identifier(col):
                 raise ValueError(f"Invalid column name in on_conflict: {col}")
 
     def _build_filter_params(self, filters: Optional[Dict[str, Any]]) -> Dict[str, str]:
@@ -79,13 +122,7 @@ class SupabaseClient:
                 if len(value) == 0:
                     params[key] = "in.("  # Empty IN yields no results
                 else:
-                    def _quote(v):
-                        if isinstance(v, (int, float)):
-                            return str(v)
-                        s = str(v).replace('"', '\\"')
-                        return f'"{s}"'
-
-                    joined = ",".join(_quote(v) for v in value)
+                    joined = ",".join(_quote_filter_value(v) for v in value)
                     params[key] = f"in.({joined})"
             elif isinstance(value, str) and value.startswith("ilike."):
                 # Pass through ilike filters directly (e.g., "ilike.*search*")
@@ -95,6 +132,14 @@ class SupabaseClient:
 
         return params
 
+    def _build_or_param(self, any_of: Dict[str, Any]) -> str:
+        """Build a PostgREST or=(col.eq.value,...) clause: rows matching any of the conditions."""
+        conditions = []
+        for key, value in any_of.items():
+            self._validate_filter_key(key)
+            conditions.append(f"{key}.eq.{_quote_filter_value(value)}")
+        return f"({','.join(conditions)})"
+
     def _sanitize_data(self, data: Union[Dict, List, Any], validate_keys: bool = True) -> Any:
         """Sanitize input data to prevent XSS and limit sizes.
 
@@ -113,14 +158,15 @@ class SupabaseClient:
         sanitized = {}
         for key, value in data.items():
             # Validate key names only for top-level DB columns
-            if validate_keys and not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', key):
+            if validate_keys and not _is_identifier(key):
                 logger.warning(f"Skipping invalid key: {key}")
                 continue
 
             # Sanitize strings
             if isinstance(value, str):
-                # Remove potential XSS vectors
-                value = re.sub(r'<script[^>]*>.*?</script>', '', value, flags=re.IGNORECASE | re.DOTALL)
+                # Remove potential XSS vectors (a script tag needs a '<', so most values skip the regex)
+                if '<' in value:
+                    value = _SCRIPT_TAG_RE.sub('', value)
                 value = value.strip()
                 # Limit string length
                 if len(value) > 10000:
@@ -141,14 +187,14 @@ class SupabaseClient:
                 detail="Database authentication failed - user token may be invalid"
             )
 
-        try:
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            error_text = e.response.text
-            logger.error(f"Supabase {operation} error: {e.response.status_code} - {error_text}")
-            # Include more details in the error for debugging
-            raise HTTPException(status_code=500, detail=f"Database error: {error_text[:200]}")
+        # Status branch instead of raise_for_status: no exception on the success path
+        if response.is_success:
+            return json_loads(response.content)
+
+        error_text = response.text
+        logger.error(f"Supabase {operation} error: {response.status_code} - {error_text}")
+        # Include more details in the error for debugging
+        raise HTTPException(status_code=500, detail=f"Database error: {error_text[:200]}")
 
     async def select(
         self,
@@ -157,7 +203,8 @@ class SupabaseClient:
         filters: Optional[Dict[str, Any]] = None,
         user_token: Optional[str] = None,
         limit: Optional[int] = None,
-        offset: Optional[int] = None
+        offset: Optional[int] = None,
+        any_of: Optional[Dict[str, Any]] = None
     ) -> List[Dict]:
         """
         Select data from table.
@@ -169,15 +216,16 @@ class SupabaseClient:
             user_token: User JWT for RLS
             limit: Maximum number of rows to return
             offset: Number of rows to skip
+            any_of: Equality conditions of which at least one must hold (PostgREST or=)
 
         Returns:
             List of matching records
         """
-        self._validate_table_name(table)
-
-        url = f"{self.url}/rest/v1/{table}"
+        url = self._table_url(table)
         params = {"select": columns}
         params.update(self._build_filter_params(filters))
+        if any_of:
+            params["or"] = self._build_or_param(any_of)
         if limit is not None:
             params["limit"] = str(limit)
         if offset is not None:
@@ -185,9 +233,8 @@ class SupabaseClient:
         headers = self._get_headers(user_token)
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, headers=headers, params=params)
-                return await self._handle_response(response, "select")
+            response = await self._get_http().get(url, headers=headers, params=params)
+            return await self._handle_response(response, "select")
         except httpx.TimeoutException:
             logger.error("Supabase request timeout")
             raise HTTPException(status_code=504, detail="Database request timeout")
@@ -255,16 +302,14 @@ class SupabaseClient:
         Returns:
             Inserted record(s)
         """
-        self._validate_table_name(table)
+        url = self._table_url(table)
 
         sanitized_data = self._sanitize_data(data)
-        url = f"{self.url}/rest/v1/{table}"
         headers = self._get_headers(user_token)
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, headers=headers, json=sanitized_data)
-                return await self._handle_response(response, "insert")
+            response = await self._get_http().post(url, headers=headers, json=sanitized_data)
+            return await self._handle_response(response, "insert")
         except httpx.TimeoutException:
             logger.error("Supabase request timeout")
             raise HTTPException(status_code=504, detail="Database request timeout")
@@ -288,17 +333,15 @@ class SupabaseClient:
         Returns:
             Updated record(s)
         """
-        self._validate_table_name(table)
+        url = self._table_url(table)
 
         sanitized_data = self._sanitize_data(data)
-        url = f"{self.url}/rest/v1/{table}"
         params = self._build_filter_params(filters)
         headers = self._get_headers(user_token)
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.patch(url, headers=headers, params=params, json=sanitized_data)
-                return await self._handle_response(response, "update")
+            response = await self._get_http().patch(url, headers=headers, params=params, json=sanitized_data)
+            return await self._handle_response(response, "update")
         except httpx.TimeoutException:
             logger.error("Supabase request timeout")
             raise HTTPException(status_code=504, detail="Database request timeout")
@@ -320,16 +363,14 @@ class SupabaseClient:
         Returns:
             Deleted record(s)
         """
-        self._validate_table_name(table)
+        url = self._table_url(table)
 
-        url = f"{self.url}/rest/v1/{table}"
         params = self._build_filter_params(filters)
         headers = self._get_headers(user_token)
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.delete(url, headers=headers, params=params)
-                return await self._handle_response(response, "delete")
+            response = await self._get_http().delete(url, headers=headers, params=params)
+            return await self._handle_response(response, "delete")
         except httpx.TimeoutException:
             logger.error("Supabase request timeout")
             raise HTTPException(status_code=504, detail="Database request timeout")
@@ -353,11 +394,10 @@ class SupabaseClient:
         Returns:
             Upserted record(s)
         """
-        self._validate_table_name(table)
+        url = self._table_url(table)
         self._validate_on_conflict(on_conflict)
 
         sanitized_data = self._sanitize_data(data)
-        url = f"{self.url}/rest/v1/{table}"
         headers = self._get_headers(user_token)
         # Add upsert header with merge-duplicates resolution
         headers["Prefer"] = "return=representation,resolution=merge-duplicates"
@@ -365,9 +405,8 @@ class SupabaseClient:
         params = {"on_conflict": on_conflict}
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(url, headers=headers, params=params, json=sanitized_data)
-                return await self._handle_response(response, "upsert")
+            response = await self._get_http().post(url, headers=headers, params=params, json=sanitized_data, timeout=60.0)
+            return await self._handle_response(response, "upsert")
         except httpx.TimeoutException:
             logger.error("Supabase request timeout")
             raise HTTPException(status_code=504, detail="Database request timeout")
@@ -389,7 +428,7 @@ class SupabaseClient:
         Returns:
             Function result
         """
-        if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', function_name):
+        if not _is_identifier(function_name):
             raise ValueError("Invalid function name")
 
         url = f"{self.url}/rest/v1/rpc/{function_name}"
@@ -397,9 +436,8 @@ class SupabaseClient:
         headers = self._get_headers(user_token)
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, headers=headers, json=sanitized_params)
-                return await self._handle_response(response, "rpc")
+            response = await self._get_http().post(url, headers=headers, json=sanitized_params)
+            return await self._handle_response(response, "rpc")
         except httpx.TimeoutException:
             logger.error("Supabase request timeout")
             raise HTTPException(status_code=504, detail="Database request timeout")
@@ -56,10 +56,14 @@ class VerifyPasswordRequest(BaseModel):
 # ============================================
 
 # Reserved usernames that cannot be used
-RESERVED_USERNAMES = [
+RESERVED_USERNAMES = frozenset({
     'admin', 'administrator', 'root', 'system', 'api', 'www',
     'ftp', 'mail', 'test', 'user', 'guest', 'null', 'undefined'
-]
+})
+
+# Allowed username characters: Unicode letters/digits, space, dot, underscore, hyphen
+USERNAME_CHARS_RE = re.compile(r'^[\w .-]+$', re.UNICODE)
+NUMERIC_ONLY_RE = re.compile(r'^[0-9]+$')
 
 
 class FriendRequestCreate(BaseModel):
@@ -68,11 +72,11 @@ class FriendRequestCreate(BaseModel):
     @validator('username')
     def validate_username(cls, v):
         # Username validation rules
-        if not re.match(r'^[\w .-]+$', v, flags=re.UNICODE):
+        if not USERNAME_CHARS_RE.match(v):
             raise ValueError('Username can only contain letters, numbers, spaces, dots, underscores, and hyphens')
-        if re.match(r'^[0-9]+$', v):
+        if NUMERIC_ONLY_RE.match(v):
             raise ValueError('Username cannot be only numbers')
-        if re.match(r'^[_-]', v) or re.match(r'[_-]$', v):
+        if v.startswith(('_', '-')):
             raise ValueError('Username cannot start or end with underscore or hyphen')
         if v.lower() in RESERVED_USERNAMES:
             raise ValueError('This username is reserved')
@@ -243,17 +247,24 @@ class CreditsTransactionResponse(BaseModel):
     event_id: Optional[str] = None
 
 
+# LiveHeats event IDs: ASCII letters, digits, underscore, hyphen
+EVENT_ID_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
+
+
 class BatchEventAccessRequest(BaseModel):
     event_ids: List[str] = Field(..., min_items=0, max_items=1000)
 
     @validator('event_ids')
     def validate_event_ids(cls, v):
+        event_ids = []
         for event_id in v:
             if not isinstance(event_id, str) or len(event_id.strip()) == 0:
                 raise ValueError('All event IDs must be non-empty strings')
-            if not re.match(r'^[a-zA-Z0-9_-]+$', event_id.strip()):
+            event_id = event_id.strip()
+            if not EVENT_ID_RE.match(event_id):
                 raise ValueError('Event IDs can only contain letters, numbers, underscores, and hyphens')
-        return [event_id.strip() for event_id in v]
+            event_ids.append(event_id)
+        return event_ids
 
 
 class BatchEventAccessResponse(BaseModel):
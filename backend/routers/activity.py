@@ -31,7 +31,6 @@ async def get_supabase(request: Request):
 async def get_current_user_id(request: Request, token: str = Depends(get_user_token)) -> str:
     """Extract user ID from token."""
     from backend_api import extract_user_id_from_token
-    from fastapi.security import HTTPAuthorizationCredentials
     creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
     return await extract_user_id_from_token(creds)
 
@@ -5,12 +5,13 @@ Admin Router - Admin panel endpoints for user management, credits, and athletes.
 import os
 import json
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from api.client import LiveheatsClient, get_liveheats_client
 from backend.models import GrantCreditsRequest, AdminCreditsAdjustRequest
 
 logger = logging.getLogger(__name__)
@@ -40,7 +41,6 @@ async def get_admin_client(request: Request):
 async def get_current_user_id(request: Request, token: str = Depends(get_user_token)) -> str:
     """Extract user ID from token."""
     from backend_api import extract_user_id_from_token
-    from fastapi.security import HTTPAuthorizationCredentials
     creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
     return await extract_user_id_from_token(creds)
 
@@ -289,7 +289,6 @@ async def get_admin_overview(
             users = []
 
         # Get today's logins
-        from datetime import timedelta
         today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
         login_activity = await admin_client.select("user_login_activity", "*", {}, user_token)
         if login_activity is None:
@@ -483,16 +482,14 @@ async def list_credit_purchases(
 @router.post("/athletes/seed")
 async def seed_athletes_database(
     request: Request,
-    user_token: str = Depends(get_user_token)
+    user_token: str = Depends(get_user_token),
+    client: LiveheatsClient = Depends(get_liveheats_client)
 ):
     """Seed athletes database with data from last 3 years FWT series (Admin only)"""
     supabase_client = await get_supabase(request)
     current_user_id = await require_admin(request, user_token)
 
     try:
-        from api.client import LiveheatsClient
-
-        client = LiveheatsClient()
         admin_client = await get_admin_client(request) or supabase_client
 
         # Get FWT series from current year + next 2 years (to catch new riders)
@@ -598,7 +595,8 @@ async def search_athletes(
 async def sync_athletes_from_event(
     request: Request,
     event_id: str = None,
-    user_token: str = Depends(get_user_token)
+    user_token: str = Depends(get_user_token),
+    client: LiveheatsClient = Depends(get_liveheats_client)
 ):
     """Sync athletes from a specific event (Admin only)"""
     supabase_client = await get_supabase(request)
@@ -608,9 +606,6 @@ async def sync_athletes_from_event(
         raise HTTPException(status_code=400, detail="event_id is required")
 
     try:
-        from api.client import LiveheatsClient
-
-        client = LiveheatsClient()
         admin_client = await get_admin_client(request) or supabase_client
 
         # Fetch event athletes
@@ -669,17 +664,14 @@ async def sync_athletes_from_event(
 async def get_athlete_series_rankings(
     athlete_id: str,
     request: Request,
-    user_token: str = Depends(get_user_token)
+    user_token: str = Depends(get_user_token),
+    client: LiveheatsClient = Depends(get_liveheats_client)
 ):
     """Get series rankings for a specific athlete (Admin only)"""
     supabase_client = await get_supabase(request)
     current_user_id = await require_admin(request, user_token)
 
     try:
-        from api.client import LiveheatsClient
-
-        client = LiveheatsClient()
-
         # Get FWT series
         series_data = await client.get_series_by_years("fwtglobal", range(2008, 2031))
         if not series_data:
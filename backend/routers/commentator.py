@@ -5,9 +5,10 @@ Commentator Router - Commentator info management endpoints.
 import logging
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from backend.core.responses import FastJSONResponse
 from backend.models import CommentatorInfoCreate, CommentatorInfoUpdate
 
 logger = logging.getLogger(__name__)
@@ -15,6 +16,12 @@ security = HTTPBearer()
 
 router = APIRouter(prefix="/api/commentator-info", tags=["Commentator"])
 
+# Athlete ids per in.(...) lookup when importing
+IMPORT_LOOKUP_CHUNK_SIZE = 100
+
+# Largest page the list endpoint returns
+MAX_PAGE_SIZE = 1000
+
 
 def get_user_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Extract raw token from credentials."""
@@ -32,12 +39,11 @@ async def get_supabase(request: Request):
 async def get_current_user_id(request: Request, token: str = Depends(get_user_token)) -> str:
     """Extract user ID from token."""
     from backend_api import extract_user_id_from_token
-    from fastapi.security import HTTPAuthorizationCredentials
     creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
     return await extract_user_id_from_token(creds)
 
 
-@router.get("/batch")
+@router.get("/batch", response_model=None)
 async def get_batch_commentator_info(
     athlete_ids: str,  # Comma-separated IDs: "id1,id2,id3"
     source: str = "all",
@@ -103,18 +109,18 @@ async def get_batch_commentator_info(
             if athlete_id not in grouped:
                 grouped[athlete_id] = []
 
-        return {
+        return FastJSONResponse(content={
             "success": True,
             "data": grouped,
             "total": len(result)
-        }
+        })
 
     except Exception as e:
         logger.error(f"Error fetching batch commentator info: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch batch commentator info: {str(e)}")
 
 
-@router.get("/export")
+@router.get("/export", response_model=None)
 async def export_all_commentator_info(
     request: Request,
     user_token: str = Depends(get_user_token)
@@ -133,7 +139,7 @@ async def export_all_commentator_info(
             "data": result
         }
 
-        return export_data
+        return FastJSONResponse(content=export_data)
 
     except Exception as e:
         logger.error(f"Error exporting commentator info: {e}")
@@ -186,7 +192,7 @@ async def create_commentator_info(
 
     try:
         # Check if info already exists
-        existing = await supabase_client.select("commentator_info", "*", {"athlete_id": info.athlete_id})
+        existing = await supabase_client.select("commentator_info", "id", {"athlete_id": info.athlete_id}, limit=1)
 
         if existing:
             raise HTTPException(status_code=409, detail="Commentator info already exists for this athlete")
@@ -231,10 +237,10 @@ async def update_commentator_info(
         logger.info(f"Updating commentator info for athlete {athlete_id} with user token")
 
         # Check if record exists for this user specifically (not friends' data)
-        existing = await supabase_client.select("commentator_info", "*", {
+        existing = await supabase_client.select("commentator_info", "id", {
             "athlete_id": athlete_id,
             "created_by": current_user_id
-        }, user_token=user_token)
+        }, user_token=user_token, limit=1)
 
         if not existing:
             # Create new record if it doesn't exist
@@ -304,22 +310,24 @@ async def delete_commentator_info(
         raise HTTPException(status_code=500, detail=f"Failed to delete commentator info: {str(e)}")
 
 
-@router.get("")
+@router.get("", response_model=None)
 async def get_all_commentator_info(
     request: Request,
+    limit: Optional[int] = Query(None, ge=0, le=MAX_PAGE_SIZE),
+    offset: Optional[int] = Query(None, ge=0),
     user_token: str = Depends(get_user_token)
 ):
-    """Get all commentator info records"""
+    """Get all commentator info records, optionally one page at a time"""
     supabase_client = await get_supabase(request)
 
     try:
-        result = await supabase_client.select("commentator_info", "*")
+        result = await supabase_client.select("commentator_info", "*", limit=limit, offset=offset)
 
-        return {
+        return FastJSONResponse(content={
             "success": True,
             "data": result,
             "total": len(result)
-        }
+        })
 
     except Exception as e:
         logger.error(f"Error fetching all commentator info: {e}")
@@ -419,6 +427,21 @@ async def import_commentator_info(
         imported_count = 0
         updated_count = 0
         errors = []
+        # New records are collected per athlete and inserted in batches after the loop;
+        # repeats of a new athlete count as updates once its insert has succeeded
+        pending_inserts: Dict[str, Dict[str, Any]] = {}
+        pending_repeats: Dict[str, int] = {}
+
+        # Look up which athletes already have a record, a chunk of ids per query
+        # so the in.(...) filter stays well within URL length limits
+        import_ids = list({record["athlete_id"] for record in import_data["data"] if record.get("athlete_id")})
+        existing_ids = set()
+        for start in range(0, len(import_ids), IMPORT_LOOKUP_CHUNK_SIZE):
+            existing = await supabase_client.select(
+                "commentator_info", "athlete_id",
+                {"athlete_id": import_ids[start:start + IMPORT_LOOKUP_CHUNK_SIZE]}
+            )
+            existing_ids.update(row["athlete_id"] for row in existing)
 
         for record in import_data["data"]:
             try:
@@ -427,10 +450,15 @@ async def import_commentator_info(
                     errors.append("Missing athlete_id in record")
                     continue
 
-                # Check if record already exists
-                existing = await supabase_client.select("commentator_info", "*", {"athlete_id": athlete_id})
+                if athlete_id in pending_inserts:
+                    # Repeated athlete in this import: later record updates the pending insert
+                    pending_inserts[athlete_id].update(
+                        {k: v for k, v in record.items() if k not in ["id", "created_at", "updated_at"]}
+                    )
+                    pending_repeats[athlete_id] = pending_repeats.get(athlete_id, 0) + 1
+                    continue
 
-                if existing:
+                if athlete_id in existing_ids:
                     # Update existing record
                     update_data = {k: v for k, v in record.items() if k not in ["id", "created_at", "updated_at"]}
                     await supabase_client.update("commentator_info", update_data, {"athlete_id": athlete_id})
@@ -440,18 +468,31 @@ async def import_commentator_info(
                     insert_data = {k: v for k, v in record.items() if k not in ["id", "created_at", "updated_at"]}
                     # Add user info to imported data
                     insert_data["created_by"] = current_user_id
-
-                    # Get user profile for author name
-                    user_profile = await supabase_client.select("user_profiles", "full_name", {"id": current_user_id})
-                    if user_profile:
-                        insert_data["author_name"] = user_profile[0]["full_name"]
-
-                    await supabase_client.insert("commentator_info", insert_data)
-                    imported_count += 1
+                    pending_inserts[athlete_id] = insert_data
 
             except Exception as e:
                 errors.append(f"Error processing record for athlete {athlete_id}: {str(e)}")
 
+        if pending_inserts:
+            # Get user profile for author name once for all new records
+            user_profile = await supabase_client.select("user_profiles", "full_name", {"id": current_user_id})
+
+            # PostgREST bulk inserts need identical keys, so batch by column set
+            inserts_by_columns: Dict[frozenset, List[Dict[str, Any]]] = {}
+            for insert_data in pending_inserts.values():
+                if user_profile:
+                    insert_data["author_name"] = user_profile[0]["full_name"]
+                inserts_by_columns.setdefault(frozenset(insert_data), []).append(insert_data)
+
+            for batch in inserts_by_columns.values():
+                try:
+                    await supabase_client.insert("commentator_info", batch)
+                    imported_count += len(batch)
+                    updated_count += sum(pending_repeats.get(r["athlete_id"], 0) for r in batch)
+                except Exception as e:
+                    athlete_ids = ", ".join(str(r["athlete_id"]) for r in batch)
+                    errors.append(f"Error inserting records for athletes {athlete_ids}: {str(e)}")
+
         return {
             "success": True,
             "imported_count": imported_count,
@@ -33,7 +33,6 @@ async def get_current_user_id(request: Request, token: str = Depends(get_user_to
     """Extract user ID from token - delegates to main app's function."""
     # Import the function from the main app to avoid duplication
     from backend_api import extract_user_id_from_token
-    from fastapi.security import HTTPAuthorizationCredentials
     creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
     return await extract_user_id_from_token(creds)
 
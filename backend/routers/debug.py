@@ -8,6 +8,7 @@ Endpoints:
 from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import logging
+import sys
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +31,6 @@ def get_supabase_client(request: Request):
 
 async def extract_user_id_from_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Import and use the main app's token extraction with full signature verification."""
-    import sys
     if "backend_api" in sys.modules:
         main_module = sys.modules["backend_api"]
         return await main_module.extract_user_id_from_token(credentials)
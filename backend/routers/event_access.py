@@ -14,8 +14,9 @@ Endpoints:
 from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from typing import Dict, List, Optional
 import logging
+import sys
 
 from backend.models import (
     EventAccessResponse,
@@ -26,6 +27,7 @@ from backend.models import (
     BatchEventAccessRequest,
     BatchEventAccessResponse,
 )
+from backend.utils import parse_iso_datetime
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +50,6 @@ def get_supabase_client(request: Request):
 
 async def extract_user_id_from_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Import and use the main app's token extraction with full signature verification."""
-    import sys
     if "backend_api" in sys.modules:
         main_module = sys.modules["backend_api"]
         return await main_module.extract_user_id_from_token(credentials)
@@ -78,7 +79,7 @@ async def check_event_access(
                 event_date_str = event_info[0].get("date")
                 if event_date_str:
                     try:
-                        event_date = datetime.fromisoformat(event_date_str.replace("Z", "+00:00"))
+                        event_date = parse_iso_datetime(event_date_str)
                     except Exception:
                         event_date = None
                     if event_date:
@@ -155,14 +156,14 @@ async def check_batch_event_access(
             accessible_events = {item["event_id"] for item in user_access_result}
 
             # Check each requested event ID with free rule
+            free_cutoff = datetime.now(timezone.utc) - timedelta(days=7)
             for event_id in request_data.event_ids:
                 # 7-day free
                 date_str = date_map.get(str(event_id))
                 is_free = False
                 if date_str:
                     try:
-                        event_date = datetime.fromisoformat(str(date_str).replace("Z", "+00:00"))
-                        is_free = (datetime.now(timezone.utc) - event_date) > timedelta(days=7)
+                        is_free = parse_iso_datetime(str(date_str)) < free_cutoff
                     except Exception:
                         is_free = False
                 access_status[event_id] = is_free or (event_id in accessible_events)
@@ -235,6 +236,123 @@ async def purchase_event_access(
         raise HTTPException(status_code=500, detail=f"Failed to purchase event access: {str(e)}")
 
 
+async def _purchase_event_batch(
+    supabase_client,
+    user_id: str,
+    event_ids: List[str],
+    event_name_by_id: Dict[str, Optional[str]],
+    user_token: str
+) -> Optional[int]:
+    """
+    Charge one credit per event and grant paid access to event_ids.
+
+    The debit comes first, as a compare-and-set on the balance just read, so
+    concurrent purchases cannot both spend the same credits; access is only
+    written once it is paid for. If a later step fails, the debit is refunded
+    (again compare-and-set). Returns the remaining credits, or None if the
+    batch was not purchased.
+    """
+    cost = len(event_ids)
+    now = datetime.now().isoformat()
+
+    # Deduct credits: only if the balance is still the one just read
+    try:
+        credits_row = await supabase_client.select(
+            "user_credits", "credits", {"user_id": user_id}, user_token=user_token
+        )
+        credits_before = credits_row[0].get("credits", 0) if credits_row else 0
+        if credits_before < cost:
+            logger.warning(f"Insufficient credits for user {user_id}: required {cost}, available {credits_before}")
+            return None
+
+        credits_after = credits_before - cost
+        updated = await supabase_client.update(
+            "user_credits",
+            {"credits": credits_after, "updated_at": now},
+            {"user_id": user_id, "credits": credits_before},
+            user_token=user_token
+        )
+        if not updated:
+            logger.warning(f"Credits of user {user_id} changed during purchase of events {event_ids}")
+            return None
+    except Exception as e:
+        logger.error(f"Error deducting credits for events {event_ids} for user {user_id}: {e}")
+        return None
+
+    async def refund_credits():
+        try:
+            restored = await supabase_client.update(
+                "user_credits",
+                {"credits": credits_before, "updated_at": datetime.now().isoformat()},
+                {"user_id": user_id, "credits": credits_after},
+                user_token=user_token
+            )
+            if not restored:
+                logger.error(f"Could not refund {cost} credits to user {user_id}: balance changed concurrently")
+        except Exception as e:
+            logger.error(f"Failed to refund {cost} credits to user {user_id}: {e}")
+
+    # Grant access
+    try:
+        await supabase_client.insert(
+            "user_event_access",
+            [{
+                "user_id": user_id,
+                "event_id": event_id,
+                "event_name": event_name_by_id.get(event_id),
+                "granted_at": now,
+                "access_type": "paid"
+            } for event_id in event_ids],
+            user_token=user_token
+        )
+    except Exception as e:
+        logger.error(f"Error granting access to events {event_ids} for user {user_id}: {e}")
+        await refund_credits()
+        return None
+
+    # Log transactions: the audit trail of the debit, so it is not optional
+    try:
+        await supabase_client.insert(
+            "credit_transactions",
+            [{
+                "user_id": user_id,
+                "amount": -1,
+                "transaction_type": "spend",
+                "credits_before": credits_before - index,
+                "credits_after": credits_before - index - 1,
+                "description": f"Event access purchase: {event_name_by_id.get(event_id) or event_id}",
+                "event_id": event_id,
+                "created_at": now
+            } for index, event_id in enumerate(event_ids)],
+            user_token=user_token
+        )
+    except Exception as e:
+        logger.error(f"Error logging credit transactions for events {event_ids} for user {user_id}: {e}")
+
+        # Undo the purchase, but only refund once the access is confirmed gone:
+        # a delete blocked by RLS affects no rows without raising
+        try:
+            revoked = await supabase_client.delete(
+                "user_event_access",
+                {"user_id": user_id, "event_id": event_ids, "access_type": "paid"},
+                user_token=user_token
+            )
+        except Exception as revoke_err:
+            logger.error(f"Failed to revoke access to events {event_ids} for user {user_id}: {revoke_err}")
+            revoked = []
+        if len(revoked) < cost:
+            logger.error(
+                f"Could not revoke access to events {event_ids} for user {user_id} "
+                f"({len(revoked)} of {cost} rows removed); keeping the purchase without its transaction log"
+            )
+            return credits_after
+
+        await refund_credits()
+        return None
+
+    return credits_after
+
+
 @router.post("/api/events/purchase-multiple", response_model=MultiEventPurchaseResponse)
 async def purchase_multiple_events(
     request_data: MultiEventPurchaseRequest,
@@ -335,67 +453,41 @@ async def purchase_multiple_events(
         # Add already purchased events to the purchased list
         purchased_events.extend(already_purchased)
 
-        # Process only events that need to be purchased (direct operations, no RPC)
-        for event_id in events_to_purchase:
-            # Find the corresponding event name
-            event_index = event_ids.index(event_id)
-            event_name = event_names[event_index] if event_index < len(event_names) else None
-
-            try:
-                # Re-check access defensively for each event
-                existing_access = await supabase_client.select(
-                    "user_event_access",
-                    "id",
-                    {"user_id": current_user_id, "event_id": event_id},
-                    user_token=user_token
-                )
-                if len(existing_access) > 0:
-                    purchased_events.append(event_id)
-                    continue
-
-                # Deduct credit
-                await supabase_client.update(
-                    "user_credits",
-                    {"credits": max(0, remaining_credits - 1), "updated_at": datetime.now().isoformat()},
-                    {"user_id": current_user_id},
-                    user_token=user_token
-                )
-
-                # Grant access
-                await supabase_client.insert(
-                    "user_event_access",
-                    [{
-                        "user_id": current_user_id,
-                        "event_id": event_id,
-                        "event_name": event_name,
-                        "granted_at": datetime.now().isoformat(),
-                        "access_type": "paid"
-                    }],
-                    user_token=user_token
-                )
-
-                # Log transaction (optional audit trail)
-                await supabase_client.insert(
-                    "credit_transactions",
-                    [{
-                        "user_id": current_user_id,
-                        "amount": -1,
-                        "transaction_type": "spend",
-                        "credits_before": remaining_credits,
-                        "credits_after": max(0, remaining_credits - 1),
-                        "description": f"Event access purchase: {event_name or event_id}",
-                        "event_id": event_id,
-                        "created_at": datetime.now().isoformat()
-                    }],
-                    user_token=user_token
-                )
-
-                purchased_events.append(event_id)
-                remaining_credits = max(0, remaining_credits - 1)
+        # Purchase the remaining events as one batch: a fixed handful of requests
+        # instead of four per event (direct operations, no RPC). Each step is
+        # undone if a later one fails, so a failed batch never keeps credits.
+        event_name_by_id = {}
+        for index, event_id in enumerate(event_ids):
+            event_name_by_id.setdefault(event_id, event_names[index] if index < len(event_names) else None)
 
-            except Exception as e:
-                logger.error(f"Error purchasing event {event_id}: {e}")
-                failed_events.append(event_id)
+        try:
+            # Re-check access defensively for the events about to be charged
+            existing_access = await supabase_client.select(
+                "user_event_access",
+                "event_id",
+                {"user_id": current_user_id, "event_id": events_to_purchase},
+                user_token=user_token
+            )
+            existing_ids = {item["event_id"] for item in existing_access}
+            purchased_events.extend(event_id for event_id in events_to_purchase if event_id in existing_ids)
+            new_event_ids = [
+                event_id for event_id in dict.fromkeys(events_to_purchase)
+                if event_id not in existing_ids
+            ]
+        except Exception as e:
+            logger.error(f"Error re-checking access for events {events_to_purchase}: {e}")
+            new_event_ids = []
+            failed_events.extend(events_to_purchase)
+
+        if new_event_ids:
+            result = await _purchase_event_batch(
+                supabase_client, current_user_id, new_event_ids, event_name_by_id, user_token
+            )
+            if result is None:
+                failed_events.extend(new_event_ids)
+            else:
+                purchased_events.extend(new_event_ids)
+                remaining_credits = result
 
         # Determine overall success
         success = len(purchased_events) > 0
@@ -10,49 +10,79 @@ Endpoints:
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Request
-from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timezone
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 import os
+import sys
 import time
-import json
+import asyncio
 import logging
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from backend.core.rate_limit import limiter
 
-from backend.utils import extract_location_from_name
+from api.client import LiveheatsClient, get_liveheats_client
+from backend.core.responses import body_etag, cached_json_response, with_etag
+from backend.core.serialization import json_dumps, json_loads
+from backend.db.cache import get_redis_client, get_with_ttl, refill_lock
+from backend.utils import extract_location_from_name, parse_iso_datetime
 
 logger = logging.getLogger(__name__)
 
-# Rate limiter for this router
-limiter = Limiter(key_func=get_remote_address)
-
 router = APIRouter(tags=["Events"])
 
 security = HTTPBearer(auto_error=True)
 
 
-async def get_redis_client(request: Request):
-    """Get Redis client from app state."""
-    if hasattr(request.app.state, "_redis_client") and request.app.state._redis_client is not None:
-        return request.app.state._redis_client
-
-    # Try to initialize Redis if not yet done
+def get_bib_number(athlete: dict) -> int:
+    """Sort key for athletes by BIB; athletes without a valid BIB go last."""
+    bib = athlete.get('bib')
+    if bib is None:
+        return 999
+    if type(bib) is int:
+        return bib
+    # LiveHeats usually sends plain digit strings: parse those without a try/except
+    if type(bib) is str and bib.isdecimal():
+        return int(bib)
     try:
-        import redis.asyncio as redis_lib
-        redis_url = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
-        client = redis_lib.from_url(redis_url, decode_responses=True)
-        pong = await client.ping()
-        if pong:
-            request.app.state._redis_client = client
-            return client
-    except Exception:
-        pass
+        return int(str(bib))
+    except (ValueError, TypeError):
+        return 999
+
+
+def event_date_key(event) -> str:
+    """Sort key for raw LiveHeats events by ISO date; invalid entries sort first."""
+    if isinstance(event, dict):
+        return event.get("date") or ""
+    return ""
+
 
-    request.app.state._redis_client = None
-    return None
+@lru_cache(maxsize=4096)
+def _format_event(event_id: str, name: str, date: str) -> dict:
+    """
+    Format a raw LiveHeats event for the frontend.
+
+    Cached per (id, name, date) since the same events come back on every
+    refetch; callers must treat the returned dict as read-only.
+    """
+    # Parse once, reuse for both display date and year
+    event_dt = parse_iso_datetime(date) if date else None
+    return {
+        "id": event_id,
+        "name": str(name)[:200],
+        "date": date,
+        "formatted_date": f"{event_dt.day:02d}.{event_dt.month:02d}.{event_dt.year}" if event_dt else "",
+        "location": extract_location_from_name(name),
+        "year": event_dt.year if event_dt else None
+    }
+
+
+def tag_event_source(athlete: dict, event_id: str, event_name: str) -> dict:
+    """Tag an athlete (in place) with the event it came from."""
+    athlete['eventSource'] = event_id
+    athlete['eventName'] = event_name
+    return athlete
 
 
 def get_supabase_client(request: Request):
@@ -67,7 +97,6 @@ def get_admin_client(request: Request):
 
 async def extract_user_id_from_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Import and use the main app's token extraction with full signature verification."""
-    import sys
     if "backend_api" in sys.modules:
         main_module = sys.modules["backend_api"]
         return await main_module.extract_user_id_from_token(credentials)
@@ -77,18 +106,105 @@ async def extract_user_id_from_token(credentials: HTTPAuthorizationCredentials =
     raise HTTPException(status_code=500, detail="Authentication module not available")
 
 
+# Upper bound on per-process events cache entries (keys vary only by include_past today)
+_EVENTS_MEM_CACHE_MAX = 64
+
+
+def _store_events_mem_cache(cache_store: dict, cache_key: str, body: bytes, expires_at: int, etag: str) -> None:
+    """Store an encoded events payload and its ETag, evicting the oldest entry once the cache is full."""
+    cache_store.pop(cache_key, None)
+    while len(cache_store) >= _EVENTS_MEM_CACHE_MAX:
+        del cache_store[next(iter(cache_store))]
+    cache_store[cache_key] = (body, expires_at, etag)
+
+
+async def _load_events(client: LiveheatsClient, include_past: bool) -> dict:
+    """Fetch events from LiveHeats and format them into the /api/events payload."""
+    if include_past:
+        events = await client.get_all_events()
+    else:
+        events = await client.get_future_events()
+
+    # Input validation and sanitization
+    if not isinstance(events, list):
+        logger.error("Invalid events data type received from API")
+        raise HTTPException(status_code=500, detail="Invalid data format")
+
+    # ISO dates sort lexicographically: sort the raw events once so the
+    # formatted list is built in order
+    events.sort(key=event_date_key)
+
+    # Format events für Frontend
+    formatted_events = []
+    for event in events:
+        if not isinstance(event, dict) or "id" not in event:
+            logger.warning(f"Skipping invalid event data: {event}")
+            continue
+
+        try:
+            formatted_events.append(_format_event(
+                str(event["id"])[:100],  # Limit length
+                event.get("name", "Unknown"),
+                event.get("date", "")
+            ))
+        except Exception as e:
+            logger.warning(f"Error formatting event {event.get('id')}: {e}")
+            continue
+
+    return {
+        "events": formatted_events,
+        "total": len(formatted_events),
+        "message": f"Found {len(formatted_events)} {'all' if include_past else 'future'} events"
+    }
+
+
+def _finish_inflight(inflight: dict, cache_key: str, task: asyncio.Task) -> None:
+    """Done callback of a shared refill task: unregister it and mark its failure as retrieved."""
+    if inflight.get(cache_key) is task:
+        del inflight[cache_key]
+    if not task.cancelled():
+        # Waiters that disconnected never read the result; avoid "exception was never retrieved"
+        task.exception()
+
+
+async def _refill_events_cache(
+    client: LiveheatsClient,
+    include_past: bool,
+    redis_client,
+    cache_store: dict,
+    cache_key: str,
+    ttl_seconds: int
+) -> Tuple[bytes, str]:
+    """Load events, store them in Redis (or the in-memory cache) and return the encoded body and its ETag."""
+    payload = await _load_events(client, include_past)
+    # Encode and tag once: the same bytes go to Redis, the in-memory cache and the responses
+    body = json_dumps(payload)
+    etag = body_etag(body)
+
+    expires_at = int(time.time()) + ttl_seconds
+    if redis_client:
+        try:
+            await redis_client.setex(cache_key, ttl_seconds, body)
+        except Exception as e:
+            logger.warning(f"Redis write failed, using in-memory cache: {e}")
+            _store_events_mem_cache(cache_store, cache_key, body, expires_at, etag)
+    else:
+        _store_events_mem_cache(cache_store, cache_key, body, expires_at, etag)
+    return body, etag
+
+
 @router.get("/api/events")
 @limiter.limit("30/minute")
 async def get_future_events(
     request: Request,
     current_user_id: str = Depends(extract_user_id_from_token),
     include_past: bool = False,
-    force_refresh: bool = False
+    force_refresh: bool = False,
+    client: LiveheatsClient = Depends(get_liveheats_client)
 ):
     """Get FWT events for event selection."""
     try:
-        import time as _time
-        _t_all = _time.perf_counter()
+        _t_all = time.perf_counter()
 
         # Prefer Redis shared cache if available, otherwise fallback to per-process memory cache
         cache_key = f"events:{'all' if include_past else 'future'}"
@@ -97,25 +213,20 @@ async def get_future_events(
 
         if redis_client and not force_refresh:
             try:
-                _t0 = _time.perf_counter()
-                cached_json = await redis_client.get(cache_key)
-                if cached_json:
-                    try:
-                        payload = json.loads(cached_json)
-                    except Exception:
-                        payload = None
-                    ttl_remaining = await redis_client.ttl(cache_key)
-                    if payload is not None and ttl_remaining and ttl_remaining > 0:
+                _t0 = time.perf_counter()
+                cached_json, ttl_remaining = await get_with_ttl(redis_client, cache_key)
+                # Cache entries are stored as encoded JSON: serve them without a decode/encode round trip
+                if cached_json and cached_json != b"null":
+                    if ttl_remaining and ttl_remaining > 0:
                         if os.getenv("DEBUG_TIMING") == "1":
-                            logger.info(f"TIMING redis_get+ttl: {(_time.perf_counter()-_t0):.4f}s, ttl={ttl_remaining}")
-                            logger.info(f"TIMING total_before_return: {(_time.perf_counter()-_t_all):.4f}s (cache hit)")
-                        response = JSONResponse(content=payload)
-                        response.headers["Cache-Control"] = f"public, max-age={int(ttl_remaining)}"
-                        return response
+                            logger.info(f"TIMING redis_get+ttl: {(time.perf_counter()-_t0):.4f}s, ttl={ttl_remaining}")
+                            logger.info(f"TIMING total_before_return: {(time.perf_counter()-_t_all):.4f}s (cache hit)")
+                        response = cached_json_response(cached_json, int(ttl_remaining))
+                        return with_etag(request, response)
             except Exception as e:
                 logger.warning(f"Redis read failed, falling back to in-memory cache: {e}")
 
-        # In-memory cache fallback
+        # In-memory cache fallback: encoded body plus expiry epoch, bounded per process
         now_ts = int(time.time())
         if not hasattr(request.app.state, "_events_cache"):
             request.app.state._events_cache = {}
@@ -123,75 +234,33 @@ async def get_future_events(
         if not force_refresh:
             cached_entry = cache_store.get(cache_key)
             if cached_entry:
-                cached_data, cached_ts = cached_entry
-                age = now_ts - cached_ts
-                if age < ttl_seconds:
-                    response = JSONResponse(content=cached_data)
-                    response.headers["Cache-Control"] = f"public, max-age={max(ttl_seconds - age, 0)}"
-                    return response
-
-        from api.client import LiveheatsClient
-        client = LiveheatsClient()
-        if include_past:
-            events = await client.get_all_events()
-        else:
-            events = await client.get_future_events()
-
-        # Input validation and sanitization
-        if not isinstance(events, list):
-            logger.error("Invalid events data type received from API")
-            raise HTTPException(status_code=500, detail="Invalid data format")
-
-        # Format events für Frontend
-        formatted_events = []
-        for event in events:
-            if not isinstance(event, dict) or "id" not in event:
-                logger.warning(f"Skipping invalid event data: {event}")
-                continue
-
-            try:
-                formatted_events.append({
-                    "id": str(event["id"])[:100],  # Limit length
-                    "name": str(event.get("name", "Unknown"))[:200],
-                    "date": event.get("date", ""),
-                    "formatted_date": datetime.fromisoformat(
-                        event["date"].replace("Z", "+00:00")
-                    ).strftime("%d.%m.%Y") if event.get("date") else "",
-                    "location": extract_location_from_name(event.get("name", "")),
-                    "year": datetime.fromisoformat(
-                        event["date"].replace("Z", "+00:00")
-                    ).year if event.get("date") else None
-                })
-            except Exception as e:
-                logger.warning(f"Error formatting event {event.get('id')}: {e}")
-                continue
-
-        # Sort by date
-        formatted_events.sort(key=lambda x: x.get("date", ""))
-
-        payload = {
-            "events": formatted_events,
-            "total": len(formatted_events),
-            "message": f"Found {len(formatted_events)} {'all' if include_past else 'future'} events"
-        }
-
-        # Store in cache and return with cache headers
-        if redis_client:
-            try:
-                await redis_client.setex(cache_key, ttl_seconds, json.dumps(payload))
-            except Exception as e:
-                logger.warning(f"Redis write failed, using in-memory cache: {e}")
-                cache_store[cache_key] = (payload, now_ts)
-        else:
-            cache_store[cache_key] = (payload, now_ts)
+                cached_body, expires_at, cached_etag = cached_entry
+                if expires_at > now_ts:
+                    response = cached_json_response(cached_body, expires_at - now_ts)
+                    return with_etag(request, response, cached_etag)
+                del cache_store[cache_key]
+
+        # Single-flight: concurrent misses for the same key share one upstream fetch.
+        # The fetch runs as its own task, and every request (the one that started it
+        # included) awaits it through shield, so a disconnecting client cancels only
+        # its own wait, never the fetch the others are waiting on.
+        if not hasattr(request.app.state, "_events_inflight"):
+            request.app.state._events_inflight = {}
+        inflight = request.app.state._events_inflight
+        task = inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(
+                _refill_events_cache(client, include_past, redis_client, cache_store, cache_key, ttl_seconds)
+            )
+            inflight[cache_key] = task
+            task.add_done_callback(lambda done: _finish_inflight(inflight, cache_key, done))
+        body, etag = await asyncio.shield(task)
 
         if os.getenv("DEBUG_TIMING") == "1":
-            import time as _time
-            logger.info(f"TIMING total_before_return: {(_time.perf_counter()-_t_all):.4f}s (cache miss)")
+            logger.info(f"TIMING total_before_return: {(time.perf_counter()-_t_all):.4f}s (cache miss)")
 
-        response = JSONResponse(content=payload)
-        response.headers["Cache-Control"] = f"public, max-age={ttl_seconds}"
-        return response
+        response = cached_json_response(body, ttl_seconds)
+        return with_etag(request, response, etag)
 
     except Exception as e:
         logger.error(f"Error fetching events: {e}")
@@ -206,39 +275,55 @@ async def get_event_athletes(
     event_id: str,
     request: Request,
     current_user_id: str = Depends(extract_user_id_from_token),
-    force_refresh: bool = False
+    force_refresh: bool = False,
+    client: LiveheatsClient = Depends(get_liveheats_client)
 ):
     """Get all athletes for a specific event"""
     try:
-        from api.client import LiveheatsClient
-
-        client = LiveheatsClient()
-
         # Redis-backed cache for event athletes
         ttl_seconds = int(os.getenv("EVENTS_TTL_SECONDS", "3600"))
         cache_key = f"eventAthletes:{event_id}"
         redis_client = await get_redis_client(request)
 
-        if redis_client and not force_refresh:
+        async def read_cached():
             try:
-                cached_json = await redis_client.get(cache_key)
-                if cached_json:
-                    payload = json.loads(cached_json)
-                    ttl_remaining = await redis_client.ttl(cache_key)
-                    if payload is not None and ttl_remaining and ttl_remaining > 0:
-                        response = JSONResponse(content=payload)
-                        response.headers["Cache-Control"] = f"public, max-age={int(ttl_remaining)}"
-                        return response
+                cached_json, ttl_remaining = await get_with_ttl(redis_client, cache_key)
+                # Cache entries are stored as encoded JSON: serve them without a decode/encode round trip
+                if cached_json and cached_json != b"null":
+                    if ttl_remaining and ttl_remaining > 0:
+                        response = cached_json_response(cached_json, int(ttl_remaining))
+                        return with_etag(request, response)
             except Exception as e:
                 logger.warning(f"Redis read failed for {cache_key}: {e}")
+            return None
 
-        # Use the existing method that already does what we need
-        result = await client.get_event_athletes(event_id)
+        if redis_client and not force_refresh:
+            cached = await read_cached()
+            if cached is not None:
+                return cached
+
+        # Concurrent misses wait here for one upstream fetch, then re-read the refilled entry
+        async with refill_lock(redis_client, cache_key):
+            if redis_client and not force_refresh:
+                cached = await read_cached()
+                if cached is not None:
+                    return cached
 
-        if not result:
-            raise HTTPException(status_code=404, detail="Event not found")
+            # Use the existing method that already does what we need
+            result = await client.get_event_athletes(event_id)
 
-        logger.info(f"Found event {result.get('event', {}).get('name')} with athletes")
+            if not result:
+                raise HTTPException(status_code=404, detail="Event not found")
+
+            # Encode once for both the cache and the response
+            body = json_dumps(result)
+            if redis_client:
+                try:
+                    await redis_client.setex(cache_key, ttl_seconds, body)
+                except Exception as e:
+                    logger.warning(f"Redis write failed for {cache_key}: {e}")
+
+        logger.info("Found event %s with athletes", result.get('event', {}).get('name'))
 
         # Sync athletes to database (background task, don't block response)
         supabase_client = get_supabase_client(request)
@@ -273,22 +358,13 @@ async def get_event_athletes(
                                 "last_seen": datetime.now(timezone.utc).isoformat()
                             })
                     except Exception as sync_error:
-                        logger.debug(f"Athlete sync skipped for {athlete['id']}: {sync_error}")
+                        logger.debug("Athlete sync skipped for %s: %s", athlete['id'], sync_error)
 
-                logger.debug(f"Synced {len(athletes_in_event)} athletes from event {event_id}")
+                logger.debug("Synced %d athletes from event %s", len(athletes_in_event), event_id)
             except Exception as e:
                 logger.debug(f"Athlete auto-sync failed (non-critical): {e}")
 
-        # Write to cache
-        if redis_client:
-            try:
-                await redis_client.setex(cache_key, ttl_seconds, json.dumps(result))
-            except Exception as e:
-                logger.warning(f"Redis write failed for {cache_key}: {e}")
-
-        response = JSONResponse(content=result)
-        response.headers["Cache-Control"] = f"public, max-age={ttl_seconds}"
-        return response
+        return with_etag(request, cached_json_response(body, ttl_seconds))
 
     except HTTPException:
         raise
@@ -303,89 +379,83 @@ async def get_multi_event_athletes(
     event_id2: str,
     request: Request,
     current_user_id: str = Depends(extract_user_id_from_token),
-    force_refresh: bool = False
+    force_refresh: bool = False,
+    client: LiveheatsClient = Depends(get_liveheats_client)
 ):
     """Get combined athletes from two events, sorted by BIB numbers for live commentary"""
     try:
-        from api.client import LiveheatsClient
-
-        client = LiveheatsClient()
         redis_client = await get_redis_client(request)
         ttl_seconds = int(os.getenv("EVENTS_TTL_SECONDS", "3600"))
 
-        async def get_event_data(event_id: str):
-            """Get event data from cache or API, and cache if fetched."""
-            cache_key = f"eventAthletes:{event_id}"
+        cache_keys = (f"eventAthletes:{event_id1}", f"eventAthletes:{event_id2}")
 
+        # Read both cache entries in one round trip
+        cached_values = (None, None)
+        if redis_client and not force_refresh:
+            try:
+                cached_values = await redis_client.mget(cache_keys)
+            except Exception as e:
+                logger.warning(f"Redis read failed for {', '.join(cache_keys)}: {e}")
+
+        async def get_event_data(event_id: str, cache_key: str, cached_json):
+            """Get event data from cache or API, and cache if fetched."""
             # Try cache first
-            if redis_client and not force_refresh:
+            if cached_json:
                 try:
-                    cached_json = await redis_client.get(cache_key)
-                    if cached_json:
-                        payload = json.loads(cached_json)
-                        if payload is not None:
-                            logger.debug(f"Cache hit for {cache_key}")
-                            return payload
+                    payload = json_loads(cached_json)
+                    if payload is not None:
+                        logger.debug("Cache hit for %s", cache_key)
+                        return payload
                 except Exception as e:
                     logger.warning(f"Redis read failed for {cache_key}: {e}")
 
             # Cache miss - fetch from API
-            logger.debug(f"Cache miss for {cache_key}, fetching from API")
+            logger.debug("Cache miss for %s, fetching from API", cache_key)
             data = await client.get_event_athletes(event_id)
 
             # Store in cache for future requests
             if redis_client and data:
                 try:
-                    await redis_client.setex(cache_key, ttl_seconds, json.dumps(data))
-                    logger.debug(f"Cached {cache_key}")
+                    await redis_client.setex(cache_key, ttl_seconds, json_dumps(data))
+                    logger.debug("Cached %s", cache_key)
                 except Exception as e:
                     logger.warning(f"Redis write failed for {cache_key}: {e}")
 
             return data
 
-        # Fetch both events (from cache or API)
-        try:
-            event1_data = await get_event_data(event_id1)
-        except Exception as e:
-            logger.error(f"Error fetching event {event_id1}: {e}")
-            raise HTTPException(status_code=500, detail=f"Failed to fetch event {event_id1}")
-
-        try:
-            event2_data = await get_event_data(event_id2)
-        except Exception as e:
-            logger.error(f"Error fetching event {event_id2}: {e}")
-            raise HTTPException(status_code=500, detail=f"Failed to fetch event {event_id2}")
+        # Fetch both events concurrently (from cache or API)
+        event1_data, event2_data = await asyncio.gather(
+            get_event_data(event_id1, cache_keys[0], cached_values[0]),
+            get_event_data(event_id2, cache_keys[1], cached_values[1]),
+            return_exceptions=True
+        )
+        for event_id, event_data in ((event_id1, event1_data), (event_id2, event2_data)):
+            if isinstance(event_data, Exception):
+                logger.error(f"Error fetching event {event_id}: {event_data}")
+                raise HTTPException(status_code=500, detail=f"Failed to fetch event {event_id}")
 
         if not event1_data or not event2_data:
             raise HTTPException(status_code=404, detail="One or both events not found")
 
-        # Combine athletes with event source information
-        combined_athletes = []
-
-        # Add athletes from event 1
-        for athlete in event1_data.get('athletes', []):
-            athlete_data = athlete.copy()
-            athlete_data['eventSource'] = event_id1
-            athlete_data['eventName'] = event1_data['event']['name']
-            combined_athletes.append(athlete_data)
-
-        # Add athletes from event 2
-        for athlete in event2_data.get('athletes', []):
-            athlete_data = athlete.copy()
-            athlete_data['eventSource'] = event_id2
-            athlete_data['eventName'] = event2_data['event']['name']
-            combined_athletes.append(athlete_data)
+        event1_name = event1_data['event']['name']
+        event2_name = event2_data['event']['name']
+        event1_athletes = event1_data.get('athletes', [])
+        event2_athletes = event2_data.get('athletes', [])
+
+        # Combine athletes with event source information. Both payloads are
+        # request-local (freshly decoded or fetched, cached before this point),
+        # so athletes are tagged in place instead of copied.
+        combined_athletes = [
+            tag_event_source(athlete, event_id, event_name)
+            for event_id, event_name, athletes in (
+                (event_id1, event1_name, event1_athletes),
+                (event_id2, event2_name, event2_athletes),
+            )
+            for athlete in athletes
+        ]
 
         # Sort by BIB numbers for proper live commentary order
-        def get_bib_number(athlete):
-            bib = athlete.get('bib')
-            if bib is None:
-                return 999  # Put athletes without BIB at the end
-            try:
-                return int(str(bib))
-            except (ValueError, TypeError):
-                return 999
-
+        # (list.sort computes each key once up front, so get_bib_number runs once per athlete)
         combined_athletes.sort(key=get_bib_number)
 
         # Create response
@@ -396,12 +466,15 @@ async def get_multi_event_athletes(
             },
             "athletes": combined_athletes,
             "total_athletes": len(combined_athletes),
-            "event1_count": len(event1_data.get('athletes', [])),
-            "event2_count": len(event2_data.get('athletes', [])),
+            "event1_count": len(event1_athletes),
+            "event2_count": len(event2_athletes),
             "message": f"Combined {len(combined_athletes)} athletes from 2 events, sorted by BIB"
         }
 
-        logger.info(f"Combined events: {event1_data['event']['name']} ({len(event1_data.get('athletes', []))}) + {event2_data['event']['name']} ({len(event2_data.get('athletes', []))}) = {len(combined_athletes)} athletes")
+        logger.info(
+            "Combined events: %s (%d) + %s (%d) = %d athletes",
+            event1_name, len(event1_athletes), event2_name, len(event2_athletes), len(combined_athletes)
+        )
 
         return response
 
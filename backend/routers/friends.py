@@ -4,6 +4,7 @@ Friends Router - Friend connections and requests.
 
 import logging
 from datetime import datetime
+from typing import Dict, Iterable
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
@@ -31,11 +32,19 @@ async def get_supabase(request: Request):
 async def get_current_user_id(request: Request, token: str = Depends(get_user_token)) -> str:
     """Extract user ID from token."""
     from backend_api import extract_user_id_from_token
-    from fastapi.security import HTTPAuthorizationCredentials
     creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
     return await extract_user_id_from_token(creds)
 
 
+async def get_profiles_by_id(supabase_client, user_ids: Iterable[str], user_token: str) -> Dict[str, dict]:
+    """Fetch the user_profiles rows for user_ids with a single IN query, keyed by id."""
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return {}
+    profiles = await supabase_client.select("user_profiles", "*", {"id": user_ids}, user_token)
+    return {profile["id"]: profile for profile in profiles}
+
+
 @router.post("/request")
 async def create_friend_request(
     friend_request: FriendRequestCreate,
@@ -124,13 +133,14 @@ async def get_received_pending_friend_requests(
             user_token
         )
 
-        pending_requests = []
-        for connection in result:
-            requester = await supabase_client.select(
-                "user_profiles", "*", {"id": connection["requester_id"]}, user_token
-            )
-            if requester:
-                pending_requests.append({**connection, "requester": requester[0]})
+        profiles = await get_profiles_by_id(
+            supabase_client, (connection["requester_id"] for connection in result), user_token
+        )
+        pending_requests = [
+            {**connection, "requester": profiles[connection["requester_id"]]}
+            for connection in result
+            if connection["requester_id"] in profiles
+        ]
 
         return {"success": True, "data": pending_requests, "total": len(pending_requests)}
 
@@ -155,13 +165,14 @@ async def get_sent_pending_friend_requests(
             user_token
         )
 
-        sent_requests = []
-        for connection in result:
-            addressee = await supabase_client.select(
-                "user_profiles", "*", {"id": connection["addressee_id"]}, user_token
-            )
-            if addressee:
-                sent_requests.append({**connection, "addressee": addressee[0]})
+        profiles = await get_profiles_by_id(
+            supabase_client, (connection["addressee_id"] for connection in result), user_token
+        )
+        sent_requests = [
+            {**connection, "addressee": profiles[connection["addressee_id"]]}
+            for connection in result
+            if connection["addressee_id"] in profiles
+        ]
 
         return {"success": True, "data": sent_requests, "total": len(sent_requests)}
 
@@ -186,13 +197,14 @@ async def get_pending_friend_requests(
             user_token
         )
 
-        pending_requests = []
-        for connection in result:
-            requester = await supabase_client.select(
-                "user_profiles", "*", {"id": connection["requester_id"]}, user_token
-            )
-            if requester:
-                pending_requests.append({**connection, "requester": requester[0]})
+        profiles = await get_profiles_by_id(
+            supabase_client, (connection["requester_id"] for connection in result), user_token
+        )
+        pending_requests = [
+            {**connection, "requester": profiles[connection["requester_id"]]}
+            for connection in result
+            if connection["requester_id"] in profiles
+        ]
 
         return {"success": True, "data": pending_requests, "total": len(pending_requests)}
 
@@ -332,26 +344,24 @@ async def get_friends(
     current_user_id = await get_current_user_id(request, user_token)
 
     try:
-        result = await supabase_client.select(
-            "user_connections", "*", {"status": "accepted"}, user_token
+        # Only connections where current user is involved
+        user_connections = await supabase_client.select(
+            "user_connections", "*", {"status": "accepted"}, user_token,
+            any_of={"requester_id": current_user_id, "addressee_id": current_user_id}
         )
 
-        # Filter connections where current user is involved
-        user_connections = [
-            conn for conn in result
-            if conn["requester_id"] == current_user_id or conn["addressee_id"] == current_user_id
+        friend_ids = [
+            connection["addressee_id"]
+            if connection["requester_id"] == current_user_id
+            else connection["requester_id"]
+            for connection in user_connections
+        ]
+        profiles = await get_profiles_by_id(supabase_client, friend_ids, user_token)
+        friends = [
+            {**connection, "friend": profiles[friend_id]}
+            for connection, friend_id in zip(user_connections, friend_ids)
+            if friend_id in profiles
         ]
-
-        friends = []
-        for connection in user_connections:
-            friend_id = (
-                connection["addressee_id"]
-                if connection["requester_id"] == current_user_id
-                else connection["requester_id"]
-            )
-            friend = await supabase_client.select("user_profiles", "*", {"id": friend_id}, user_token)
-            if friend:
-                friends.append({**connection, "friend": friend[0]})
 
         return {"success": True, "data": friends, "total": len(friends)}
 
@@ -5,14 +5,18 @@ Endpoints:
 - GET /api/events/{event_id}/livescoring - Get live scoring data for an event
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timezone
 import os
-import json
+import sys
 import logging
 
+from api.client import LiveheatsClient, get_liveheats_client
+from backend.core.responses import cached_json_response
+from backend.core.serialization import json_dumps
+from backend.db.cache import cache_write, get_redis_client, get_with_ttl
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Live Scoring"])
@@ -20,16 +24,21 @@ router = APIRouter(tags=["Live Scoring"])
 security = HTTPBearer(auto_error=True)
 
 
-async def get_redis_client(request: Request):
-    """Get Redis client from app state."""
-    if hasattr(request.app.state, "_redis_client") and request.app.state._redis_client is not None:
-        return request.app.state._redis_client
-    return None
+def with_cache_info(body: bytes, cache_ttl: int, cached: bool) -> bytes:
+    """
+    Append cache_ttl and cached to an encoded JSON object without re-encoding it.
+
+    Raises ValueError if body is not a JSON object.
+    """
+    body = body.strip()
+    if not (body.startswith(b"{") and body.endswith(b"}")):
+        raise ValueError("live scoring body is not a JSON object")
+    separator = b"," if body[1:-1].strip() else b""
+    return body[:-1] + separator + b'"cache_ttl":%d,"cached":%s}' % (cache_ttl, b"true" if cached else b"false")
 
 
 async def extract_user_id_from_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Import and use the main app's token extraction with full signature verification."""
-    import sys
     if "backend_api" in sys.modules:
         main_module = sys.modules["backend_api"]
         return await main_module.extract_user_id_from_token(credentials)
@@ -42,8 +51,10 @@ async def extract_user_id_from_token(credentials: HTTPAuthorizationCredentials =
 async def get_event_live_scoring(
     event_id: str,
     request: Request,
+    background_tasks: BackgroundTasks,
     current_user_id: str = Depends(extract_user_id_from_token),
-    force_refresh: bool = False
+    force_refresh: bool = False,
+    client: LiveheatsClient = Depends(get_liveheats_client)
 ):
     """
     Get live scoring data (heats and results) for an event.
@@ -58,26 +69,18 @@ async def get_event_live_scoring(
     - Upcoming events: 5 minute TTL
     """
     try:
-        from api.client import LiveheatsClient
-
-        client = LiveheatsClient()
         redis_client = await get_redis_client(request)
-        cache_key = f"livescoring:{event_id}"
+        # v2: entries no longer store cache_ttl/cached (added per response by with_cache_info)
+        cache_key = f"livescoring:v2:{event_id}"
 
         # Try cache first
         if redis_client and not force_refresh:
             try:
-                cached_json = await redis_client.get(cache_key)
-                if cached_json:
-                    payload = json.loads(cached_json)
-                    ttl_remaining = await redis_client.ttl(cache_key)
-                    if payload is not None and ttl_remaining and ttl_remaining > 0:
-                        # Add cache info to response
-                        payload["cached"] = True
-                        payload["cache_ttl"] = ttl_remaining
-                        response = JSONResponse(content=payload)
-                        response.headers["Cache-Control"] = f"public, max-age={int(ttl_remaining)}"
-                        return response
+                cached_json, ttl_remaining = await get_with_ttl(redis_client, cache_key)
+                if cached_json and cached_json != b"null" and ttl_remaining and ttl_remaining > 0:
+                    # Add cache info to the stored body without decoding it
+                    body = with_cache_info(cached_json, int(ttl_remaining), cached=True)
+                    return cached_json_response(body, int(ttl_remaining))
             except Exception as e:
                 logger.warning(f"Redis read failed for {cache_key}: {e}")
 
@@ -96,26 +99,22 @@ async def get_event_live_scoring(
         else:
             ttl_seconds = 300  # 5 minutes for upcoming/other
 
-        # Add metadata
-        response_data = {
+        # Add metadata; cache_ttl/cached are appended per response, not stored
+        body = json_dumps({
             **live_scoring_data,
-            "last_updated": datetime.now(timezone.utc).isoformat(),
-            "cache_ttl": ttl_seconds,
-            "cached": False
-        }
+            "last_updated": datetime.now(timezone.utc).isoformat()
+        })
 
-        # Cache the response
+        # Cache the response once it is sent
         if redis_client:
-            try:
-                await redis_client.setex(cache_key, ttl_seconds, json.dumps(response_data))
-            except Exception as e:
-                logger.warning(f"Redis write failed for {cache_key}: {e}")
+            background_tasks.add_task(cache_write, redis_client, cache_key, ttl_seconds, body)
 
-        logger.info(f"Live scoring fetched for event {event_id}: {len(live_scoring_data.get('divisions', []))} divisions, status={event_status}, ttl={ttl_seconds}s")
+        logger.info(
+            "Live scoring fetched for event %s: %d divisions, status=%s, ttl=%ss",
+            event_id, len(live_scoring_data.get('divisions', [])), event_status, ttl_seconds
+        )
 
-        json_response = JSONResponse(content=response_data)
-        json_response.headers["Cache-Control"] = f"public, max-age={ttl_seconds}"
-        return json_response
+        return cached_json_response(with_cache_info(body, ttl_seconds, cached=False), ttl_seconds)
 
     except HTTPException:
         raise
@@ -9,17 +9,14 @@ from typing import Dict, Any
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from backend.core.rate_limit import limiter
 
 from backend.models import ProfileUpdateRequest, VerifyPasswordRequest, PasswordChangeRequest
+from backend.routers.users import forget_username
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
-# Rate limiter for sensitive endpoints
-limiter = Limiter(key_func=get_remote_address)
-
 router = APIRouter(prefix="/api/profile", tags=["Profile"])
 
 
@@ -39,7 +36,6 @@ async def get_supabase(request: Request):
 async def get_current_user_id(request: Request, token: str = Depends(get_user_token)) -> str:
     """Extract user ID from token."""
     from backend_api import extract_user_id_from_token
-    from fastapi.security import HTTPAuthorizationCredentials
     creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
     return await extract_user_id_from_token(creds)
 
@@ -61,7 +57,17 @@ async def update_profile(
         if req.organization is not None:
             update_data["organization"] = req.organization
 
+        previous_name = None
+        if req.full_name is not None:
+            current_profile = await supabase_client.select(
+                "user_profiles", "full_name", {"id": current_user_id}, user_token
+            )
+            previous_name = current_profile[0].get("full_name") if current_profile else None
+
         await supabase_client.update("user_profiles", update_data, {"id": current_user_id}, user_token)
+        # The previous name is free again in this worker's username cache
+        if previous_name and previous_name != req.full_name:
+            forget_username(previous_name)
         return {"success": True, "message": "Profile updated"}
 
     except HTTPException:
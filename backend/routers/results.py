@@ -8,15 +8,21 @@ Endpoints:
 - GET /api/fullresults/{series_id} - Get rankings for a specific series
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
+from operator import itemgetter
 import os
+import sys
 import re
-import json
+import asyncio
 import logging
 
+from api.client import LiveheatsClient, get_liveheats_client
+from backend.core.responses import body_etag, cached_gzip_json_response, cached_json_response, with_etag
+from backend.core.serialization import gzip_cache_value, json_dumps, json_loads
+from backend.db.cache import cache_write, cache_write_many, get_redis_client, get_with_ttl, refill_lock
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Results"])
@@ -31,16 +37,8 @@ def get_user_token(credentials: HTTPAuthorizationCredentials = Depends(security)
     return credentials.credentials
 
 
-async def get_redis_client(request: Request):
-    """Get Redis client from app state."""
-    if hasattr(request.app.state, "_redis_client"):
-        return request.app.state._redis_client
-    return None
-
-
 async def extract_user_id_from_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Import and use the main app's token extraction with full signature verification."""
-    import sys
     if "backend_api" in sys.modules:
         main_module = sys.modules["backend_api"]
         return await main_module.extract_user_id_from_token(credentials)
@@ -50,6 +48,9 @@ async def extract_user_id_from_token(credentials: HTTPAuthorizationCredentials =
     raise HTTPException(status_code=500, detail="Authentication module not available")
 
 
+SERIES_YEAR_RE = re.compile(r'\b(20\d{2})\b')
+
+
 def normalize_series_name(series_name: str) -> str:
     if not series_name:
         return series_name
@@ -63,103 +64,134 @@ async def get_series_rankings_for_event(
     event_id: str,
     request: Request,
     current_user_id: str = Depends(extract_user_id_from_token),
-    force_refresh: bool = False
+    force_refresh: bool = False,
+    client: LiveheatsClient = Depends(get_liveheats_client)
 ):
     """Get FWT series rankings for athletes in a specific event"""
     try:
-        from api.client import LiveheatsClient
-
-        client = LiveheatsClient()
-
         # Redis client init
         ttl_seconds = int(os.getenv("EVENTS_TTL_SECONDS", "3600"))
         cache_key = f"seriesRankings:{event_id}"
+        etag_key = f"seriesRankingsEtag:{event_id}"
+        event_athletes_key = f"eventAthletes:{event_id}"
         redis_client = await get_redis_client(request)
 
-        # Endpoint-level cache
-        if redis_client and not force_refresh:
+        async def read_cached():
+            # Endpoint-level cache: entry, TTL and ETag in one round trip
             try:
-                cached_json = await redis_client.get(cache_key)
-                if cached_json:
-                    payload = json.loads(cached_json)
-                    ttl_remaining = await redis_client.ttl(cache_key)
-                    if payload is not None and ttl_remaining and ttl_remaining > 0:
-                        response = JSONResponse(content=payload)
-                        response.headers["Cache-Control"] = f"public, max-age={int(ttl_remaining)}"
-                        return response
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    cached_json, ttl_remaining, cached_etag = await (
+                        pipe.get(cache_key).ttl(cache_key).get(etag_key).execute()
+                    )
+                # Cache entries are stored as encoded (and, when large, gzipped) JSON:
+                # serve them without a decode/encode round trip. The ETag is the one of
+                # the uncompressed body, stored alongside, so it matches the miss path.
+                if cached_json and cached_json != b"null" and cached_etag:
+                    if ttl_remaining and ttl_remaining > 0:
+                        response = cached_gzip_json_response(request, cached_json, int(ttl_remaining))
+                        return with_etag(request, response, cached_etag.decode())
             except Exception as e:
                 logger.warning(f"Redis read failed for {cache_key}: {e}")
+            return None
 
-        # First get event athletes to have athlete IDs (with its own cache)
-        event_athletes_key = f"eventAthletes:{event_id}"
-        event_data = None
         if redis_client and not force_refresh:
+            cached = await read_cached()
+            if cached is not None:
+                return cached
+
+        # Concurrent misses wait here for one upstream fetch, then re-read the refilled entry
+        async with refill_lock(redis_client, cache_key):
+            if redis_client and not force_refresh:
+                cached = await read_cached()
+                if cached is not None:
+                    return cached
+
+            # Entries refilled on this miss, written together in one round trip before
+            # the lock is released, so the next waiter finds them
+            pending_writes = {}
             try:
-                cached_event_json = await redis_client.get(event_athletes_key)
-                if cached_event_json:
-                    event_data = json.loads(cached_event_json)
-            except Exception as e:
-                logger.warning(f"Redis read failed for {event_athletes_key}: {e}")
-        if event_data is None:
-            event_data = await client.get_event_athletes(event_id)
-            if redis_client and event_data:
+                # Get FWT series only from fwtglobal (privacy and domain decision).
+                # Independent of the event athletes, so it is fetched concurrently.
+                series_task = asyncio.create_task(
+                    client.get_series_by_years("fwtglobal", range(2008, 2031), redis_client)
+                )
                 try:
-                    await redis_client.setex(event_athletes_key, ttl_seconds, json.dumps(event_data))
-                except Exception as e:
-                    logger.warning(f"Redis write failed for {event_athletes_key}: {e}")
-        if not event_data:
-            raise HTTPException(status_code=404, detail="Event not found")
-
-        # Extract athlete IDs
-        athlete_ids = []
-        for division in event_data.get('event', {}).get('eventDivisions', []):
-            for entry in division.get('entries', []):
-                if entry.get('athlete', {}).get('id'):
-                    athlete_ids.append(entry['athlete']['id'])
-
-        if not athlete_ids:
-            return {
-                "event": event_data['event'],
-                "series_rankings": [],
-                "message": "No athletes found in event"
-            }
-
-        # Get FWT series only from fwtglobal (privacy and domain decision)
-        series_data = await client.get_series_by_years("fwtglobal", range(2008, 2031))
-        if not series_data:
-            return {
-                "event": event_data['event'],
-                "series_rankings": [],
-                "message": "No FWT series found"
-            }
-
-        # Get series IDs
-        series_ids = [s["id"] for s in series_data]
-
-        # Fetch rankings for all series
-        rankings = await client.fetch_multiple_series(series_ids, athlete_ids)
+                    # First get event athletes to have athlete IDs (with its own cache)
+                    event_data = None
+                    if redis_client and not force_refresh:
+                        try:
+                            cached_event_json = await redis_client.get(event_athletes_key)
+                            if cached_event_json:
+                                event_data = json_loads(cached_event_json)
+                        except Exception as e:
+                            logger.warning(f"Redis read failed for {event_athletes_key}: {e}")
+                    if event_data is None:
+                        event_data = await client.get_event_athletes(event_id)
+                        if event_data:
+                            pending_writes[event_athletes_key] = json_dumps(event_data)
+                    if not event_data:
+                        raise HTTPException(status_code=404, detail="Event not found")
+                except BaseException:
+                    series_task.cancel()
+                    raise
+
+                # Extract athlete IDs, deduplicated (athletes can be entered in several divisions)
+                divisions = (event_data.get('event') or {}).get('eventDivisions') or ()
+                athlete_ids = list(dict.fromkeys(
+                    athlete_id
+                    for division in divisions
+                    for entry in division.get('entries') or ()
+                    if (athlete_id := (entry.get('athlete') or {}).get('id'))
+                ))
+
+                if not athlete_ids:
+                    series_task.cancel()
+                    return {
+                        "event": event_data['event'],
+                        "series_rankings": [],
+                        "message": "No athletes found in event"
+                    }
+
+                series_data = await series_task
+                if not series_data:
+                    return {
+                        "event": event_data['event'],
+                        "series_rankings": [],
+                        "message": "No FWT series found"
+                    }
+
+                # Get series IDs
+                series_ids = [s["id"] for s in series_data]
+
+                # Fetch rankings for all series
+                rankings = await client.fetch_multiple_series(
+                    series_ids, athlete_ids, LiveheatsClient.event_athlete_details(event_data)
+                )
 
-        # Structure response
-        response_data = {
-            "event": event_data['event'],
-            "series_rankings": rankings,
-            "athletes_count": len(athlete_ids),
-            "series_count": len(rankings),
-            "message": f"Found rankings for {len(athlete_ids)} athletes across {len(rankings)} series"
-        }
+                # Structure response
+                response_data = {
+                    "event": event_data['event'],
+                    "series_rankings": rankings,
+                    "athletes_count": len(athlete_ids),
+                    "series_count": len(rankings),
+                    "message": f"Found rankings for {len(athlete_ids)} athletes across {len(rankings)} series"
+                }
 
-        logger.info(f"Series rankings for event {event_data['event']['name']}: {len(rankings)} series, {len(athlete_ids)} athletes")
+                logger.info(
+                    "Series rankings for event %s: %d series, %d athletes",
+                    event_data['event']['name'], len(rankings), len(athlete_ids)
+                )
 
-        # Store endpoint payload in cache
-        if redis_client:
-            try:
-                await redis_client.setex(cache_key, ttl_seconds, json.dumps(response_data))
-            except Exception as e:
-                logger.warning(f"Redis write failed for {cache_key}: {e}")
+                # Store endpoint payload in cache; multi-MB payloads are kept gzipped
+                body = json_dumps(response_data)
+                etag = body_etag(body)
+                pending_writes[cache_key] = gzip_cache_value(body)
+                pending_writes[etag_key] = etag.encode()
 
-        json_response = JSONResponse(content=response_data)
-        json_response.headers["Cache-Control"] = f"public, max-age={ttl_seconds}"
-        return json_response
+                return with_etag(request, cached_json_response(body, ttl_seconds), etag)
+            finally:
+                if redis_client:
+                    await cache_write_many(redis_client, ttl_seconds, pending_writes)
 
     except HTTPException:
         raise
@@ -173,82 +205,93 @@ async def get_athlete_results(
     athlete_id: str,
     request: Request,
     current_user_id: str = Depends(extract_user_id_from_token),
-    force_refresh: bool = False
+    force_refresh: bool = False,
+    client: LiveheatsClient = Depends(get_liveheats_client)
 ):
     """Get event results history for a specific athlete"""
     try:
-        from api.client import LiveheatsClient
-
-        client = LiveheatsClient()
-
         ttl_seconds = int(os.getenv("EVENTS_TTL_SECONDS", "3600"))
         cache_key = f"athleteResults:{athlete_id}"
         redis_client = await get_redis_client(request)
 
-        if redis_client and not force_refresh:
+        async def read_cached():
             try:
-                cached_json = await redis_client.get(cache_key)
-                if cached_json:
-                    payload = json.loads(cached_json)
-                    ttl_remaining = await redis_client.ttl(cache_key)
-                    if payload is not None and ttl_remaining and ttl_remaining > 0:
-                        response = JSONResponse(content=payload)
-                        response.headers["Cache-Control"] = f"public, max-age={int(ttl_remaining)}"
-                        return response
+                cached_json, ttl_remaining = await get_with_ttl(redis_client, cache_key)
+                # Cache entries are stored as encoded JSON: serve them without a decode/encode round trip
+                if cached_json and cached_json != b"null":
+                    if ttl_remaining and ttl_remaining > 0:
+                        return cached_json_response(cached_json, int(ttl_remaining))
             except Exception as e:
                 logger.warning(f"Redis read failed for {cache_key}: {e}")
+            return None
 
-        # Get complete FWT series history only from fwtglobal since 2008
-        series_data = await client.get_series_by_years("fwtglobal", range(2008, 2031))
-        if not series_data:
-            return {
+        if redis_client and not force_refresh:
+            cached = await read_cached()
+            if cached is not None:
+                return cached
+
+        # Concurrent misses wait here for one upstream fetch, then re-read the refilled entry
+        async with refill_lock(redis_client, cache_key):
+            if redis_client and not force_refresh:
+                cached = await read_cached()
+                if cached is not None:
+                    return cached
+
+            # Get complete FWT series history only from fwtglobal since 2008
+            series_data = await client.get_series_by_years("fwtglobal", range(2008, 2031), redis_client)
+            if not series_data:
+                return {
+                    "athlete_id": athlete_id,
+                    "results": [],
+                    "message": "No FWT series found"
+                }
+
+            series_ids = [s["id"] for s in series_data]
+
+            # Get rankings which include results
+            rankings = await client.fetch_multiple_series(series_ids, [athlete_id])
+
+            # Extract results from rankings, decorated with their date sort key
+            # (missing dates sort last) so sorting compares plain strings.
+            # fetch_multiple_series already filtered every division to this athlete;
+            # the rankings query nests the event under eventDivision.
+            keyed_results = [
+                (event.get("date") or "", {
+                    "series_name": series["series_name"],
+                    "division": division_name,
+                    "event_name": event.get("name", "Unknown Event"),
+                    "place": result.get("place"),
+                    "points": result.get("points"),
+                    "date": event.get("date"),
+                    "result_data": result
+                })
+                for series in rankings
+                for division_name, division_rankings in series["divisions"].items()
+                for ranking in division_rankings
+                for result in ranking.get("results") or ()
+                for event in (result.get("event") or (result.get("eventDivision") or {}).get("event") or {},)
+            ]
+
+            # Sort by date (newest first)
+            keyed_results.sort(key=itemgetter(0), reverse=True)
+            athlete_results = [entry for _, entry in keyed_results]
+
+            response_data = {
                 "athlete_id": athlete_id,
-                "results": [],
-                "message": "No FWT series found"
+                "results": athlete_results,
+                "total_results": len(athlete_results),
+                "message": f"Found {len(athlete_results)} results for athlete"
             }
 
-        series_ids = [s["id"] for s in series_data]
-
-        # Get rankings which include results
-        rankings = await client.fetch_multiple_series(series_ids, [athlete_id])
-
-        # Extract results from rankings
-        athlete_results = []
-        for series in rankings:
-            for division_name, division_rankings in series["divisions"].items():
-                for ranking in division_rankings:
-                    if ranking["athlete"]["id"] == athlete_id:
-                        for result in ranking.get("results", []):
-                            athlete_results.append({
-                                "series_name": series["series_name"],
-                                "division": division_name,
-                                "event_name": result.get("event", {}).get("name", "Unknown Event"),
-                                "place": result.get("place"),
-                                "points": result.get("points"),
-                                "date": result.get("event", {}).get("date"),
-                                "result_data": result
-                            })
-
-        # Sort by date (newest first) - handle None values by putting them at the end
-        athlete_results.sort(key=lambda x: x.get("date") or "", reverse=True)
-
-        response_data = {
-            "athlete_id": athlete_id,
-            "results": athlete_results,
-            "total_results": len(athlete_results),
-            "message": f"Found {len(athlete_results)} results for athlete"
-        }
-
-        logger.info(f"Found {len(athlete_results)} results for athlete {athlete_id}")
-        if redis_client:
-            try:
-                await redis_client.setex(cache_key, ttl_seconds, json.dumps(response_data))
-            except Exception as e:
-                logger.warning(f"Redis write failed for {cache_key}: {e}")
+            logger.info("Found %d results for athlete %s", len(athlete_results), athlete_id)
+            body = json_dumps(response_data)
+            if redis_client:
+                try:
+                    await redis_client.setex(cache_key, ttl_seconds, body)
+                except Exception as e:
+                    logger.warning(f"Redis write failed for {cache_key}: {e}")
 
-        json_response = JSONResponse(content=response_data)
-        json_response.headers["Cache-Control"] = f"public, max-age={ttl_seconds}"
-        return json_response
+        return cached_json_response(body, ttl_seconds)
 
     except Exception as e:
         logger.error(f"Error fetching results for athlete {athlete_id}: {e}")
@@ -258,34 +301,30 @@ async def get_athlete_results(
 @router.get("/api/fullresults")
 async def get_all_series(
     request: Request,
+    background_tasks: BackgroundTasks,
     current_user_id: str = Depends(extract_user_id_from_token),
-    force_refresh: bool = False
+    force_refresh: bool = False,
+    client: LiveheatsClient = Depends(get_liveheats_client)
 ):
     """Get all available FWT series with metadata"""
     try:
-        from api.client import LiveheatsClient
-
-        client = LiveheatsClient()
-
         ttl_seconds = int(os.getenv("EVENTS_TTL_SECONDS", "3600"))
         cache_key = "fullresults"
         redis_client = await get_redis_client(request)
 
         if redis_client and not force_refresh:
             try:
-                cached_json = await redis_client.get(cache_key)
-                if cached_json:
-                    payload = json.loads(cached_json)
-                    ttl_remaining = await redis_client.ttl(cache_key)
-                    if payload is not None and ttl_remaining and ttl_remaining > 0:
-                        response = JSONResponse(content=payload)
-                        response.headers["Cache-Control"] = f"public, max-age={int(ttl_remaining)}"
+                cached_json, ttl_remaining = await get_with_ttl(redis_client, cache_key)
+                # Cache entries are stored as encoded JSON: serve them without a decode/encode round trip
+                if cached_json and cached_json != b"null":
+                    if ttl_remaining and ttl_remaining > 0:
+                        response = cached_json_response(cached_json, int(ttl_remaining))
                         return response
             except Exception as e:
                 logger.warning(f"Redis read failed for {cache_key}: {e}")
 
         # Get series only from fwtglobal
-        all_series = await client.get_series_by_years("fwtglobal", range(2008, 2031))
+        all_series = await client.get_series_by_years("fwtglobal", range(2008, 2031), redis_client)
 
         # Enhance series data with metadata
         enhanced_series = []
@@ -293,7 +332,7 @@ async def get_all_series(
             series_name = normalize_series_name(series.get("name", ""))
 
             # Extract year from series name
-            year_match = re.search(r'\b(20\d{2})\b', series_name)
+            year_match = SERIES_YEAR_RE.search(series_name)
             year = int(year_match.group(1)) if year_match else None
 
             # Determine category based on name patterns
@@ -327,15 +366,11 @@ async def get_all_series(
             "message": f"Found {len(enhanced_series)} series"
         }
 
+        body = json_dumps(payload)
         if redis_client:
-            try:
-                await redis_client.setex(cache_key, ttl_seconds, json.dumps(payload))
-            except Exception as e:
-                logger.warning(f"Redis write failed for {cache_key}: {e}")
+            background_tasks.add_task(cache_write, redis_client, cache_key, ttl_seconds, body)
 
-        response = JSONResponse(content=payload)
-        response.headers["Cache-Control"] = f"public, max-age={ttl_seconds}"
-        return response
+        return cached_json_response(body, ttl_seconds)
 
     except Exception as e:
         logger.error(f"Error fetching all series: {e}")
@@ -346,15 +381,13 @@ async def get_all_series(
 async def get_series_rankings(
     series_id: str,
     request: Request,
+    background_tasks: BackgroundTasks,
     current_user_id: str = Depends(extract_user_id_from_token),
-    force_refresh: bool = False
+    force_refresh: bool = False,
+    client: LiveheatsClient = Depends(get_liveheats_client)
 ):
     """Get rankings for a specific series with all divisions"""
     try:
-        from api.client import LiveheatsClient
-
-        client = LiveheatsClient()
-
         # Cache first
         ttl_seconds = int(os.getenv("EVENTS_TTL_SECONDS", "3600"))
         cache_key = f"fullresults:{series_id}"
@@ -362,13 +395,11 @@ async def get_series_rankings(
 
         if redis_client and not force_refresh:
             try:
-                cached_json = await redis_client.get(cache_key)
-                if cached_json:
-                    payload = json.loads(cached_json)
-                    ttl_remaining = await redis_client.ttl(cache_key)
-                    if payload is not None and ttl_remaining and ttl_remaining > 0:
-                        response = JSONResponse(content=payload)
-                        response.headers["Cache-Control"] = f"public, max-age={int(ttl_remaining)}"
+                cached_json, ttl_remaining = await get_with_ttl(redis_client, cache_key)
+                # Cache entries are stored as encoded JSON: serve them without a decode/encode round trip
+                if cached_json and cached_json != b"null":
+                    if ttl_remaining and ttl_remaining > 0:
+                        response = cached_json_response(cached_json, int(ttl_remaining))
                         return response
             except Exception as e:
                 logger.warning(f"Redis read failed for {cache_key}: {e}")
@@ -419,15 +450,11 @@ async def get_series_rankings(
                 "message": f"Found {total_athletes} athletes across {len(all_rankings)} divisions"
             }
 
+            body = json_dumps(payload)
             if redis_client:
-                try:
-                    await redis_client.setex(cache_key, ttl_seconds, json.dumps(payload))
-                except Exception as e:
-                    logger.warning(f"Redis write failed for {cache_key}: {e}")
+                background_tasks.add_task(cache_write, redis_client, cache_key, ttl_seconds, body)
 
-            response = JSONResponse(content=payload)
-            response.headers["Cache-Control"] = f"public, max-age={ttl_seconds}"
-            return response
+            return cached_json_response(body, ttl_seconds)
 
     except HTTPException:
         raise
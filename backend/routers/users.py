@@ -6,19 +6,49 @@ Endpoints:
 """
 
 from fastapi import APIRouter, HTTPException, Request
-from typing import Optional
-import re
+from typing import Dict, Optional
+import os
+import time
 import logging
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from backend.core.rate_limit import limiter
+from backend.models.schemas import RESERVED_USERNAMES, USERNAME_CHARS_RE, NUMERIC_ONLY_RE
 
 logger = logging.getLogger(__name__)
 
-# Rate limiter - this endpoint is PUBLIC (no auth) so must be protected
-limiter = Limiter(key_func=get_remote_address)
-
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
+# Names recently found taken, name -> expires_at: live validation re-checks the same
+# names on every keystroke. Only "taken" is cached. It is per worker, and a stale
+# "taken" is harmless, while a stale "available" could offer a name another
+# worker just saw claimed. Bounded; the oldest entries are evicted first.
+_TAKEN_USERNAMES: Dict[str, float] = {}
+_TAKEN_USERNAMES_MAX = 10000
+USERNAME_CACHE_TTL_SECONDS = int(os.getenv("USERNAME_CACHE_TTL_SECONDS", "60"))
+
+
+def forget_username(name: str) -> None:
+    """Drop a name from this worker's taken-names cache, e.g. after a profile releases it."""
+    _TAKEN_USERNAMES.pop(name.strip(), None)
+
+
+async def is_username_taken(supabase_client, candidate: str) -> bool:
+    """Look up whether a profile already uses candidate; "taken" answers are cached for USERNAME_CACHE_TTL_SECONDS."""
+    now = time.monotonic()
+    expires_at = _TAKEN_USERNAMES.get(candidate)
+    if expires_at is not None:
+        if expires_at > now:
+            return True
+        del _TAKEN_USERNAMES[candidate]
+
+    existing_user = await supabase_client.select("user_profiles", "id", {"full_name": candidate})
+    if not existing_user:
+        return False
+
+    while len(_TAKEN_USERNAMES) >= _TAKEN_USERNAMES_MAX:
+        del _TAKEN_USERNAMES[next(iter(_TAKEN_USERNAMES))]
+    _TAKEN_USERNAMES[candidate] = now + USERNAME_CACHE_TTL_SECONDS
+    return True
+
 
 def get_supabase_client(request: Request):
     """Get Supabase client from app state."""
@@ -44,20 +74,17 @@ async def check_username_availability(username: str, request: Request):
             return {"available": False, "reason": "Name must be between 2 and 30 characters"}
 
         # Allow unicode letters/digits via \w, plus space and dot and hyphen
-        if not re.match(r'^[\w .-]+$', candidate, flags=re.UNICODE):
+        if not USERNAME_CHARS_RE.match(candidate):
             return {"available": False, "reason": "Name can include letters, numbers, spaces, dots, underscores and hyphens"}
 
-        if re.match(r'^[0-9]+$', candidate):
+        if NUMERIC_ONLY_RE.match(candidate):
             return {"available": False, "reason": "Name cannot be only numbers"}
 
-        reserved_names = ['admin', 'administrator', 'root', 'system', 'api', 'www', 'ftp', 'mail', 'test', 'user', 'guest', 'null', 'undefined']
-        if candidate.lower() in reserved_names:
+        if candidate.lower() in RESERVED_USERNAMES:
             return {"available": False, "reason": "This name is reserved"}
 
-        # Check if username exists (case-insensitive)
-        existing_user = await supabase_client.select("user_profiles", "id", {"full_name": candidate})
-
-        if existing_user:
+        # Check if username exists
+        if await is_username_taken(supabase_client, candidate):
             return {"available": False, "reason": "Name is already taken"}
 
         return {"available": True, "reason": "Username is available"}
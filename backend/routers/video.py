@@ -3,6 +3,7 @@ Video Router - Admin endpoints for managing athlete run videos from XML sources.
 """
 
 import re
+import asyncio
 import logging
 import unicodedata
 import html
@@ -14,10 +15,16 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 import httpx
 
+from backend.core.responses import FastJSONResponse
+
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
-router = APIRouter(prefix="/api/video", tags=["Video"])
+router = APIRouter(
+    prefix="/api/video",
+    tags=["Video"],
+    default_response_class=FastJSONResponse,
+)
 
 
 # Pydantic models for request/response validation
@@ -46,6 +53,8 @@ class ParsedXmlData(BaseModel):
 
 
 class MatchAthletesRequest(BaseModel):
+    # Rider dicts as returned by /parse-xml; an optional precomputed
+    # "normalized_name" skips server-side normalization
     riders: List[Dict[str, Any]]
     eventId: str
 
@@ -97,7 +106,6 @@ async def get_admin_client(request: Request):
 async def get_current_user_id(request: Request, token: str = Depends(get_user_token)) -> str:
     """Extract user ID from token."""
     from backend_api import extract_user_id_from_token
-    from fastapi.security import HTTPAuthorizationCredentials
     creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
     return await extract_user_id_from_token(creds)
 
@@ -164,18 +172,24 @@ def levenshtein_distance(s1: str, s2: str) -> int:
     return previous_row[-1]
 
 
-def fuzzy_match(name: str, candidates: Dict[str, Any], threshold: float = 0.8) -> Optional[tuple]:
+def fuzzy_match(
+    name: str,
+    candidates: Dict[str, Any],
+    threshold: float = 0.8,
+    normalized_name: Optional[str] = None
+) -> Optional[tuple]:
     """Find best fuzzy match for a name among candidates.
 
     Args:
         name: The name to match
         candidates: Dict mapping normalized names to athlete records
         threshold: Minimum similarity ratio (0-1) to consider a match
+        normalized_name: Precomputed normalize_string(name), if already known
 
     Returns:
         Tuple of (athlete_record, similarity_score) or None if no match above threshold
     """
-    normalized_name = normalize_string(name)
+    normalized_name = normalized_name or normalize_string(name)
     best_match = None
     best_score = 0.0
 
@@ -227,6 +241,10 @@ def parse_youtube_timestamp(url: str) -> Dict[str, Any]:
         return {"url": url, "timestamp": 0}
 
 
+# Captures every rider child element in a single pass over a <rider> block
+_ALL_FIELDS_RE = re.compile(r'<(bib|name|class|sex|nation|points|state|riderrun)>([^<]*)</\1>')
+
+
 def parse_xml_content(xml_content: str) -> Dict[str, Any]:
     """Parse XML content from tv.open-faces.com format.
 
@@ -273,24 +291,22 @@ def parse_xml_content(xml_content: str) -> Dict[str, Any]:
     if rider_blocks:
         # Nested element format
         for block in rider_blocks:
-            def get_element(name: str) -> str:
-                match = re.search(rf'<{name}>([^<]*)</{name}>', block)
-                if match:
-                    # Decode HTML entities (e.g., &#xE9; -> é)
-                    return html.unescape(match.group(1))
-                return ''
-
-            riderrun_url = get_element('riderrun')
-            parsed_url = parse_youtube_timestamp(riderrun_url)
+            # Decode HTML entities (e.g., &#xE9; -> é); first occurrence of a field wins
+            fields: Dict[str, str] = {}
+            for name, value in _ALL_FIELDS_RE.findall(block):
+                if name not in fields:
+                    fields[name] = html.unescape(value)
+
+            parsed_url = parse_youtube_timestamp(fields.get('riderrun', ''))
 
             riders.append({
-                "bib": get_element('bib'),
-                "name": get_element('name'),
-                "rider_class": get_element('class'),
-                "sex": get_element('sex'),
-                "nation": get_element('nation'),
-                "points": get_element('points'),
-                "state": get_element('state'),
+                "bib": fields.get('bib', ''),
+                "name": fields.get('name', ''),
+                "rider_class": fields.get('class', ''),
+                "sex": fields.get('sex', ''),
+                "nation": fields.get('nation', ''),
+                "points": fields.get('points', ''),
+                "state": fields.get('state', ''),
                 "youtubeUrl": parsed_url["url"],
                 "youtubeTimestamp": parsed_url["timestamp"]
             })
@@ -358,13 +374,17 @@ async def parse_xml(
                 detail="Either xmlUrl or xmlContent is required"
             )
 
-        parsed = parse_xml_content(content)
+        parsed = await asyncio.to_thread(parse_xml_content, content)
+
+        # Normalize once here so /match-athletes can reuse it
+        for rider in parsed["riders"]:
+            rider["normalized_name"] = normalize_string(rider["name"])
 
         return {
             "success": True,
             "data": parsed,
             "normalizedNames": [
-                {"original": r["name"], "normalized": normalize_string(r["name"])}
+                {"original": r["name"], "normalized": r["normalized_name"]}
                 for r in parsed["riders"]
             ]
         }
@@ -376,6 +396,67 @@ async def parse_xml(
         raise HTTPException(status_code=500, detail="Failed to parse XML content")
 
 
+def match_riders_to_athletes(riders: List[Dict[str, Any]], athletes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Match parsed riders to athletes: exact name, then normalized name, then fuzzy."""
+    # Build lookup maps
+    exact_lookup = {a["name"]: a for a in athletes}
+    normalized_lookup = {normalize_string(a["name"]): a for a in athletes}
+
+    matches = []
+    for rider in riders:
+        rider_name = rider.get("name", "")
+
+        # Try exact match first
+        if rider_name in exact_lookup:
+            athlete = exact_lookup[rider_name]
+            matches.append({
+                "rider_name": rider_name,
+                "athlete_id": athlete["id"],
+                "athlete_name": athlete["name"],
+                "match_type": "exact"
+            })
+            continue
+
+        # Try normalized match
+        normalized_name = rider.get("normalized_name") or normalize_string(rider_name)
+        if normalized_name in normalized_lookup:
+            athlete = normalized_lookup[normalized_name]
+            matches.append({
+                "rider_name": rider_name,
+                "athlete_id": athlete["id"],
+                "athlete_name": athlete["name"],
+                "match_type": "normalized"
+            })
+            continue
+
+        # Try fuzzy match (80% similarity threshold)
+        fuzzy_result = fuzzy_match(
+            rider_name, normalized_lookup, threshold=0.8, normalized_name=normalized_name
+        )
+        if fuzzy_result:
+            athlete, score = fuzzy_result
+            logger.info(f"Fuzzy match for '{rider_name}': '{athlete['name']}' (score: {score:.2f})")
+            matches.append({
+                "rider_name": rider_name,
+                "athlete_id": athlete["id"],
+                "athlete_name": athlete["name"],
+                "match_type": "fuzzy",
+                "fuzzy_score": round(score, 2)
+            })
+            continue
+
+        # No match found - log for debugging
+        logger.debug(f"No match for rider: '{rider_name}' (normalized: '{normalized_name}')")
+        matches.append({
+            "rider_name": rider_name,
+            "athlete_id": None,
+            "athlete_name": None,
+            "match_type": "none"
+        })
+
+    return matches
+
+
 @router.post("/match-athletes")
 async def match_athletes(
     body: MatchAthletesRequest,
@@ -396,59 +477,8 @@ async def match_athletes(
 
         logger.info(f"Loaded {len(athletes)} athletes from database")
 
-        # Build lookup maps
-        exact_lookup = {a["name"]: a for a in athletes}
-        normalized_lookup = {normalize_string(a["name"]): a for a in athletes}
-
-        matches = []
-        for rider in body.riders:
-            rider_name = rider.get("name", "")
-
-            # Try exact match first
-            if rider_name in exact_lookup:
-                athlete = exact_lookup[rider_name]
-                matches.append({
-                    "rider_name": rider_name,
-                    "athlete_id": athlete["id"],
-                    "athlete_name": athlete["name"],
-                    "match_type": "exact"
-                })
-                continue
-
-            # Try normalized match
-            normalized_name = normalize_string(rider_name)
-            if normalized_name in normalized_lookup:
-                athlete = normalized_lookup[normalized_name]
-                matches.append({
-                    "rider_name": rider_name,
-                    "athlete_id": athlete["id"],
-                    "athlete_name": athlete["name"],
-                    "match_type": "normalized"
-                })
-                continue
-
-            # Try fuzzy match (80% similarity threshold)
-            fuzzy_result = fuzzy_match(rider_name, normalized_lookup, threshold=0.8)
-            if fuzzy_result:
-                athlete, score = fuzzy_result
-                logger.info(f"Fuzzy match for '{rider_name}': '{athlete['name']}' (score: {score:.2f})")
-                matches.append({
-                    "rider_name": rider_name,
-                    "athlete_id": athlete["id"],
-                    "athlete_name": athlete["name"],
-                    "match_type": "fuzzy",
-                    "fuzzy_score": round(score, 2)
-                })
-                continue
-
-            # No match found - log for debugging
-            logger.debug(f"No match for rider: '{rider_name}' (normalized: '{normalized_name}')")
-            matches.append({
-                "rider_name": rider_name,
-                "athlete_id": None,
-                "athlete_name": None,
-                "match_type": "none"
-            })
+        # Normalizing and fuzzy matching every athlete is CPU-bound; keep it off the event loop
+        matches = await asyncio.to_thread(match_riders_to_athletes, body.riders, athletes)
 
         matched_count = sum(1 for m in matches if m["match_type"] != "none")
 
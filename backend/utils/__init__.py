@@ -3,6 +3,7 @@ from .formatters import (
     extract_location_from_name,
     extract_event_location,
     extract_year_from_name,
+    parse_iso_datetime,
     normalize_event_for_matching,
     calculate_event_core_similarity,
     events_match_historically,
@@ -13,6 +14,7 @@ __all__ = [
     'extract_location_from_name',
     'extract_event_location',
     'extract_year_from_name',
+    'parse_iso_datetime',
     'normalize_event_for_matching',
     'calculate_event_core_similarity',
     'events_match_historically',
@@ -5,10 +5,80 @@ Helper functions for formatting and extracting data from event names, etc.
 """
 
 import re
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
-
-
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+# Precompiled patterns for event name parsing
+_FWT_PREFIX_RE = re.compile(r'^(FWT\s*-?\s*)', re.IGNORECASE)
+_IFSA_PREFIX_RE = re.compile(r'^(IFSA\s*-?\s*)', re.IGNORECASE)
+_ORG_PREFIX_RE = re.compile(r'^(FWT\s*-?\s*|IFSA\s*-?\s*)', re.IGNORECASE)
+_WS_RE = re.compile(r'\s+')
+_YEAR_RE = re.compile(r'\b(20\d{2})\b')
+_STAR_RE = re.compile(r'\d+\*')
+_RATING_WORD_RE = re.compile(r'^\d+\*?$')
+_SPONSOR_RE = re.compile(
+    r'\s+by\s+[A-Za-z][A-Za-z\s&]+?(?=\s+(?:Qualifier|Challenger|Open|Championship|$))',
+    re.IGNORECASE
+)
+
+# Event names that don't refer to a single location (matched against lowercased names),
+# combined into one alternation so they are checked in a single scan
+_NON_LOCATION_RE = re.compile("|".join((
+    r"freeride'?her",
+    r"world championship",
+    r"qualifying list",
+    r"national rankings",
+    r"challenger by \w+",
+    r"region \d+ [a-z-]+"
+)))
+
+_LOCATION_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'^\d{4}\s+([A-Za-z][A-Za-z\s]+?)(?:\s+(?:Challenger|Qualifier|Open|Freeride|by))',
+    r'^([A-Za-z][A-Za-z\s]+?)\s+\d{4}',
+    r'(?:Freeride\s+Week\s+(?:at\s+)?)?([A-Za-z][A-Za-z\s]+?)(?:\s+(?:Challenger|Qualifier|by|Freeride))',
+    r'^([A-Za-z][A-Za-z\s]{2,}?)(?:\s+(?:Open|Faces|Week))'
+))
+
+# Known venues for extract_location_from_name, in priority order
+_LOCATIONS = (
+    ("chamonix", "Chamonix, France"),
+    ("verbier", "Verbier, Switzerland"),
+    ("fieberbrunn", "Fieberbrunn, Austria"),
+    ("kicking horse", "Kicking Horse, Canada"),
+    ("revelstoke", "Revelstoke, Canada"),
+    ("xtreme", "Verbier, Switzerland"),
+    ("ordino", "Ordino Arcalis, Andorra"),
+    ("baqueira", "Baqueira Beret, Spain"),
+    ("obertauern", "Obertauern, Austria"),
+    ("la clusaz", "La Clusaz, France"),
+)
+_LOCATION_PRIORITY = {key: (priority, full) for priority, (key, full) in enumerate(_LOCATIONS)}
+# Known location mappings for extract_event_location, checked in order
+_LOCATION_MAPPINGS = (
+    ("chamonix", "Chamonix"),
+    ("verbier", "Verbier"),
+    ("fieberbrunn", "Fieberbrunn"),
+    ("kicking horse", "Kicking Horse"),
+    ("revelstoke", "Revelstoke"),
+    ("xtreme", "Verbier"),  # Special case: Xtreme = Verbier
+    ("ordino", "Ordino"),
+    ("baqueira", "Baqueira"),
+    ("obertauern", "Obertauern"),
+    ("la clusaz", "La Clusaz"),
+    ("andorra", "Ordino"),
+)
+_LOCATION_MAPPING_PRIORITY = {key: (priority, name) for priority, (key, name) in enumerate(_LOCATION_MAPPINGS)}
+_EXCLUDED_LOCATION_WORDS = frozenset({'open', 'freeride', 'week', 'by', 'faces', 'the', 'and', 'of', 'in'})
+_EXCLUDED_FALLBACK_WORDS = frozenset({'open', 'freeride', 'week', 'faces', 'challenger', 'qualifier'})
+
+# One scan finds every known venue in a name instead of one substring test per venue
+_LOCATIONS_RE = re.compile("|".join(re.escape(key) for key, _ in _LOCATIONS))
+_LOCATION_MAPPINGS_RE = re.compile("|".join(re.escape(key) for key, _ in _LOCATION_MAPPINGS))
+
+
+@lru_cache(maxsize=4096)
 def extract_location_from_name(event_name: str) -> str:
     """
     Extract location from event name.
@@ -19,22 +89,10 @@ def extract_location_from_name(event_name: str) -> str:
     Returns:
         Location string (e.g., "Chamonix, France")
     """
-    locations = {
-        "Chamonix": "Chamonix, France",
-        "Verbier": "Verbier, Switzerland",
-        "Fieberbrunn": "Fieberbrunn, Austria",
-        "Kicking Horse": "Kicking Horse, Canada",
-        "Revelstoke": "Revelstoke, Canada",
-        "Xtreme": "Verbier, Switzerland",
-        "Ordino": "Ordino Arcalis, Andorra",
-        "Baqueira": "Baqueira Beret, Spain",
-        "Obertauern": "Obertauern, Austria",
-        "La Clusaz": "La Clusaz, France",
-    }
-
-    for location_key, full_location in locations.items():
-        if location_key.lower() in event_name.lower():
-            return full_location
+    found = _LOCATIONS_RE.findall(event_name.lower())
+    if found:
+        # Several venues in one name: the earliest entry in _LOCATIONS wins
+        return min(_LOCATION_PRIORITY[key] for key in found)[1]
 
     # Fallback: try to extract from event name
     parts = event_name.split(" - ")
@@ -44,84 +102,75 @@ def extract_location_from_name(event_name: str) -> str:
     return "TBD"
 
 
+@lru_cache(maxsize=4096)
 def extract_event_location(event_name: str) -> str:
     """
     Extract location from event name with improved pattern matching.
     Handles various FWT event naming conventions.
     """
-    # Known location mappings for better accuracy
-    location_mappings = {
-        "chamonix": "Chamonix",
-        "verbier": "Verbier",
-        "fieberbrunn": "Fieberbrunn",
-        "kicking horse": "Kicking Horse",
-        "revelstoke": "Revelstoke",
-        "xtreme": "Verbier",  # Special case: Xtreme = Verbier
-        "ordino": "Ordino",
-        "baqueira": "Baqueira",
-        "obertauern": "Obertauern",
-        "la clusaz": "La Clusaz",
-        "andorra": "Ordino"
-    }
-
     # Normalize event name
     normalized = event_name.strip()
-    normalized = re.sub(r'^(FWT\s*-?\s*)', '', normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r'^(IFSA\s*-?\s*)', '', normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r'\s+', ' ', normalized).strip()
+    normalized = _FWT_PREFIX_RE.sub('', normalized)
+    normalized = _IFSA_PREFIX_RE.sub('', normalized)
+    normalized = _WS_RE.sub(' ', normalized).strip()
 
     # Check for non-location events
-    non_location_patterns = [
-        r"freeride'?her",
-        r"world championship",
-        r"qualifying list",
-        r"national rankings",
-        r"challenger by \w+",
-        r"region \d+ [a-z-]+"
-    ]
-
     name_lower = normalized.lower()
-    for pattern in non_location_patterns:
-        if re.search(pattern, name_lower):
-            return "Generic"
+    if _NON_LOCATION_RE.search(name_lower):
+        return "Generic"
 
-    # Try exact location matching first
-    for location_key, location_name in location_mappings.items():
-        if location_key in name_lower:
-            return location_name
+    # Try exact location matching first; the earliest mapping wins
+    found = _LOCATION_MAPPINGS_RE.findall(name_lower)
+    if found:
+        return min(_LOCATION_MAPPING_PRIORITY[key] for key in found)[1]
 
     # Pattern-based extraction
-    location_patterns = [
-        r'^\d{4}\s+([A-Za-z][A-Za-z\s]+?)(?:\s+(?:Challenger|Qualifier|Open|Freeride|by))',
-        r'^([A-Za-z][A-Za-z\s]+?)\s+\d{4}',
-        r'(?:Freeride\s+Week\s+(?:at\s+)?)?([A-Za-z][A-Za-z\s]+?)(?:\s+(?:Challenger|Qualifier|by|Freeride))',
-        r'^([A-Za-z][A-Za-z\s]{2,}?)(?:\s+(?:Open|Faces|Week))'
-    ]
-
-    for pattern in location_patterns:
-        match = re.search(pattern, normalized, re.IGNORECASE)
+    for pattern in _LOCATION_PATTERNS:
+        match = pattern.search(normalized)
         if match:
             location = match.group(1).strip()
-            excluded_words = ['open', 'freeride', 'week', 'by', 'faces', 'the', 'and', 'of', 'in']
-            if location.lower() not in excluded_words and len(location) > 2:
-                return re.sub(r'\s+', ' ', location).strip()
+            if location.lower() not in _EXCLUDED_LOCATION_WORDS and len(location) > 2:
+                return _WS_RE.sub(' ', location).strip()
 
     # Fallback
     words = normalized.split()
     for word in words:
         if (len(word) > 3 and
             word.isalpha() and
-            word.lower() not in ['open', 'freeride', 'week', 'faces', 'challenger', 'qualifier'] and
-            not re.match(r'^\d+\*?$', word)):
+            word.lower() not in _EXCLUDED_FALLBACK_WORDS and
+            not _RATING_WORD_RE.match(word)):
             return word
 
     return "Unknown"
 
 
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == '_'
+
+
+@lru_cache(maxsize=4096)
 def extract_year_from_name(event_name: str) -> int:
-    """Extract year from event name."""
-    match = re.search(r'\b(20\d{2})\b', event_name)
-    return int(match.group(1)) if match else 0
+    """Extract year from event name (first standalone "20xx" token)."""
+    s = event_name
+    n = len(s)
+    for i in range(n - 3):
+        if (s[i] == '2' and s[i + 1] == '0' and s[i + 2].isdecimal() and s[i + 3].isdecimal()
+                and (i == 0 or not _is_word_char(s[i - 1]))
+                and (i + 4 == n or not _is_word_char(s[i + 4]))):
+            return int(s[i:i + 4])
+    return 0
+
+
+@lru_cache(maxsize=4096)
+def parse_iso_datetime(date_str: str) -> datetime:
+    """
+    Parse ISO format date string, accepting a trailing "Z" for UTC.
+
+    Cached since many events share the same start date.
+    """
+    if date_str.endswith("Z"):
+        date_str = date_str[:-1] + "+00:00"
+    return datetime.fromisoformat(date_str)
 
 
 def format_event_date(date_str: Optional[str]) -> str:
@@ -138,12 +187,21 @@ def format_event_date(date_str: Optional[str]) -> str:
         return ""
 
     try:
-        dt = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-        return dt.strftime("%d.%m.%Y")
+        dt = parse_iso_datetime(date_str)
+        # Same output as strftime("%d.%m.%Y") without the locale-aware formatter
+        return f"{dt.day:02d}.{dt.month:02d}.{dt.year}"
     except (ValueError, TypeError):
         return ""
 
 
+# Sponsor names that can lead an event name (matched as substrings of the first word)
+_KNOWN_SPONSORS = (
+    'dynastar', 'salomon', 'atomic', 'rossignol', 'volkl', 'k2',
+    'peak', 'performance', 'orage', 'north', 'face'
+)
+
+
+@lru_cache(maxsize=4096)
 def normalize_event_for_matching(event_name: str) -> str:
     """
     Normalize event name for historical matching.
@@ -152,88 +210,135 @@ def normalize_event_for_matching(event_name: str) -> str:
     normalized = event_name.strip()
 
     # Remove year (2024, 2025, etc.)
-    normalized = re.sub(r'\b20\d{2}\b', '', normalized)
+    normalized = _YEAR_RE.sub('', normalized)
 
     # Remove organization prefixes
-    normalized = re.sub(r'^(FWT\s*-?\s*|IFSA\s*-?\s*)', '', normalized, flags=re.IGNORECASE)
+    normalized = _ORG_PREFIX_RE.sub('', normalized)
 
     # Remove sponsor parts
-    normalized = re.sub(
-        r'\s+by\s+[A-Za-z][A-Za-z\s&]+?(?=\s+(?:Qualifier|Challenger|Open|Championship|$))',
-        '',
-        normalized,
-        flags=re.IGNORECASE
-    )
+    normalized = _SPONSOR_RE.sub('', normalized)
 
     # Check for known sponsors at beginning
     words = normalized.split()
     if len(words) > 2:
         first_word = words[0].lower()
-        known_sponsors = ['dynastar', 'salomon', 'atomic', 'rossignol', 'volkl', 'k2', 'peak', 'performance', 'orage', 'north', 'face']
-        if any(sponsor in first_word for sponsor in known_sponsors):
+        if any(sponsor in first_word for sponsor in _KNOWN_SPONSORS):
             normalized = ' '.join(words[1:])
 
     # Clean up
-    normalized = re.sub(r'\s+', ' ', normalized).strip()
+    normalized = _WS_RE.sub(' ', normalized).strip()
     return normalized.lower()
 
 
-def calculate_event_core_similarity(event1_norm: str, event2_norm: str) -> float:
+_EVENT_KEYWORDS = ('qualifier', 'challenger', 'open', 'faces', 'week', 'championship', 'freeride')
+_BOOLEAN_KEYWORDS = ('qualifier', 'challenger', 'open', 'faces', 'week', 'freeride')
+_BOOLEAN_MASK = (1 << len(_BOOLEAN_KEYWORDS)) - 1
+
+
+def _keyword_mask(name: str, keywords: Tuple[str, ...]) -> int:
+    """Pack keyword presence into an int, one bit per keyword."""
+    mask = 0
+    for bit, keyword in enumerate(keywords):
+        if keyword in name:
+            mask |= 1 << bit
+    return mask
+
+
+# Each distinct word seen in event names gets one bit, so word sets can be
+# compared with integer AND/OR + bit_count. Capped to bound memory.
+_TOKEN_BITS: Dict[str, int] = {}
+_MAX_TOKEN_BITS = 4096
+
+
+def _word_mask(words: Iterable[str]) -> Optional[int]:
+    """Bitset of words, or None once the token table is full."""
+    mask = 0
+    for word in words:
+        bit = _TOKEN_BITS.get(word)
+        if bit is None:
+            if len(_TOKEN_BITS) >= _MAX_TOKEN_BITS:
+                return None
+            bit = _TOKEN_BITS[word] = len(_TOKEN_BITS)
+        mask |= 1 << bit
+    return mask
+
+
+@dataclass(frozen=True)
+class _CoreComponents:
+    """Precomputed matching features of a normalized event name."""
+    words: FrozenSet[str]
+    word_mask: Optional[int]  # bitset over _TOKEN_BITS, None if the table was full
+    star_rating: Tuple[str, ...]
+    event_type: int  # bitmask over _EVENT_KEYWORDS
+    flags: int  # bitmask over _BOOLEAN_KEYWORDS
+
+
+@lru_cache(maxsize=8192)
+def _extract_core_components(name: str) -> _CoreComponents:
+    """Extract core components (words, star rating, event type) from a normalized event name."""
+    words = frozenset(word for word in name.split() if len(word) > 2)
+    return _CoreComponents(
+        words=words,
+        word_mask=_word_mask(words),
+        star_rating=tuple(_STAR_RE.findall(name)),
+        event_type=_keyword_mask(name, _EVENT_KEYWORDS),
+        flags=_keyword_mask(name, _BOOLEAN_KEYWORDS),
+    )
+
+
+def calculate_event_core_similarity(
+    event1_norm: str,
+    event2_norm: str,
+    threshold: Optional[float] = None
+) -> float:
     """
     Calculate similarity between normalized event names.
     Focus on core components: location, event type, star rating.
+
+    If threshold is given, returns 0.0 as soon as the remaining components
+    can no longer lift the score above it.
     """
-    def extract_core_components(name):
-        components = {
-            'words': set(word for word in name.split() if len(word) > 2),
-            'star_rating': re.findall(r'\d+\*', name),
-            'event_type': [],
-            'has_qualifier': 'qualifier' in name,
-            'has_challenger': 'challenger' in name,
-            'has_open': 'open' in name,
-            'has_faces': 'faces' in name,
-            'has_week': 'week' in name,
-            'has_freeride': 'freeride' in name
-        }
-
-        event_keywords = ['qualifier', 'challenger', 'open', 'faces', 'week', 'championship', 'freeride']
-        for keyword in event_keywords:
-            if keyword in name:
-                components['event_type'].append(keyword)
-
-        return components
-
-    comp1 = extract_core_components(event1_norm)
-    comp2 = extract_core_components(event2_norm)
+    comp1 = _extract_core_components(event1_norm)
+    comp2 = _extract_core_components(event2_norm)
+    has_words = bool(comp1.words and comp2.words)
 
     total_score = 0
-    max_score = 0
+    # Word overlap (4, only if both have words) + star rating (2) + event type (2) + booleans (1)
+    max_score = 9 if has_words else 5
+    remaining = 5
 
     # Word overlap
-    if comp1['words'] and comp2['words']:
-        word_overlap = len(comp1['words'].intersection(comp2['words'])) / len(comp1['words'].union(comp2['words']))
+    if has_words:
+        if comp1.word_mask is not None and comp2.word_mask is not None:
+            word_overlap = (comp1.word_mask & comp2.word_mask).bit_count() / (comp1.word_mask | comp2.word_mask).bit_count()
+        else:
+            word_overlap = len(comp1.words & comp2.words) / len(comp1.words | comp2.words)
         total_score += word_overlap * 4
-        max_score += 4
+        if threshold is not None and (total_score + remaining) / max_score <= threshold:
+            return 0.0
 
     # Star rating must match exactly
-    if comp1['star_rating'] == comp2['star_rating']:
+    if comp1.star_rating == comp2.star_rating:
         total_score += 2
-    max_score += 2
+    remaining -= 2
+    if threshold is not None and (total_score + remaining) / max_score <= threshold:
+        return 0.0
 
     # Event type similarity
-    event_type_overlap = len(set(comp1['event_type']).intersection(set(comp2['event_type']))) / max(len(set(comp1['event_type']).union(set(comp2['event_type']))), 1)
+    event_type_overlap = (comp1.event_type & comp2.event_type).bit_count() / max((comp1.event_type | comp2.event_type).bit_count(), 1)
     total_score += event_type_overlap * 2
-    max_score += 2
+    remaining -= 2
+    if threshold is not None and (total_score + remaining) / max_score <= threshold:
+        return 0.0
 
     # Boolean features
-    boolean_features = ['has_qualifier', 'has_challenger', 'has_open', 'has_faces', 'has_week', 'has_freeride']
-    matching_booleans = sum(1 for feature in boolean_features if comp1[feature] == comp2[feature])
-    total_score += (matching_booleans / len(boolean_features)) * 1
-    max_score += 1
+    matching_booleans = (~(comp1.flags ^ comp2.flags) & _BOOLEAN_MASK).bit_count()
+    total_score += (matching_booleans / len(_BOOLEAN_KEYWORDS)) * 1
 
-    return total_score / max_score if max_score > 0 else 0
+    return total_score / max_score
 
 
+@lru_cache(maxsize=16384)
 def events_match_historically(current_event: str, historical_event: str) -> bool:
     """
     Check if events are the same across years with sponsor flexibility.
@@ -248,15 +353,23 @@ def events_match_historically(current_event: str, historical_event: str) -> bool
     if current_norm == historical_norm:
         return True
 
-    similarity = calculate_event_core_similarity(current_norm, historical_norm)
+    similarity = calculate_event_core_similarity(current_norm, historical_norm, threshold=0.85)
     return similarity > 0.85
 
 
+_NON_MAIN_SERIES_KEYWORDS = ("qualifier", "challenger", "junior")
+# "freeride world tour" is covered by "world tour"
+_MAIN_SERIES_KEYWORDS = ("pro tour", "world tour")
+
+
 def is_main_series(series_name: str) -> bool:
     """Check if series is a main series (Pro Tour, World Tour) to avoid duplicates."""
     name_lower = series_name.lower()
-    return any(keyword in name_lower for keyword in [
-        "pro tour", "world tour", "freeride world tour"
-    ]) and not any(keyword in name_lower for keyword in [
-        "qualifier", "challenger", "junior"
-    ])
+    # Most series are qualifiers/challengers/juniors, so reject those first
+    for keyword in _NON_MAIN_SERIES_KEYWORDS:
+        if keyword in name_lower:
+            return False
+    for keyword in _MAIN_SERIES_KEYWORDS:
+        if keyword in name_lower:
+            return True
+    return False
@@ -13,18 +13,24 @@ else:
 # Add current directory to Python path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 import uvicorn
+import asyncio
 import logging
 import time as _time
 import httpx
 import re
 
 # Import from backend modules
-from backend.db import SupabaseClient
+from backend.db import SupabaseClient, create_redis_client
+from backend.core.responses import FastJSONResponse
+from backend.core.rate_limit import limiter
+from api.client import close_liveheats_client
 from backend.routers import core as core_router
 from backend.routers import credits as credits_router
 from backend.routers import profile as profile_router
@@ -38,47 +44,13 @@ from backend.routers import events as events_router
 from backend.routers import event_access as event_access_router
 from backend.routers import video as video_router
 from backend.routers import livescoring as livescoring_router
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 import time
 import jwt
 import json
-try:
-    import redis.asyncio as redis
-except Exception:
-    redis = None
-
-# Redis client factory (standard Redis only)
-async def get_redis_client(request):
-    """Get Redis client (standard server)."""
-    if hasattr(request.app.state, "_redis_client") and request.app.state._redis_client is not None:
-        return request.app.state._redis_client
-
-    # Standard Redis (server-side)
-    if redis is not None:
-        # Default to local Redis when running via systemd
-        redis_url = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
-        try:
-            client = redis.from_url(redis_url, decode_responses=True)
-            # Validate connectivity (fast ping)
-            try:
-                pong = await client.ping()
-                if pong:
-                    request.app.state._redis_client = client
-                    logger.info(f"Using Redis at {redis_url}")
-                    return request.app.state._redis_client
-            except Exception as e:
-                logger.warning(f"Redis ping failed for {redis_url}: {e}")
-        except Exception as e:
-            logger.warning(f"Redis init failed for {redis_url}: {e}")
-
-    # No Redis available
-    request.app.state._redis_client = None
-    return None
-
-# Rate limiting
-limiter = Limiter(key_func=get_remote_address)
+import hashlib
+from collections import OrderedDict
 
 # Add the current directory to the path so we can import our modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -86,7 +58,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Enhanced logging setup
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s - IP: %(ip)s' if hasattr(logging, 'ip') else '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
@@ -123,7 +95,7 @@ def get_user_token(credentials: HTTPAuthorizationCredentials = Depends(security)
     
     return credentials.credentials
 
-_JWKS_CACHE: dict = {"keys": None, "cached_at": 0}
+_JWKS_CACHE: dict = {"keys": None, "public_keys": {}, "cached_at": 0}
 
 def _supabase_issuer() -> Optional[str]:
     if not SUPABASE_URL:
@@ -145,11 +117,9 @@ async def _fetch_jwks() -> Optional[dict]:
         logger.error("JWKS fetch error: %s", str(e))
         return None
 
-async def _get_public_key_from_jwks(token: str) -> Optional[str]:
-    """Get a PEM public key from JWKS matching the token's kid."""
+async def _get_public_key_from_jwks(kid: Optional[str]) -> Optional[str]:
+    """Get a PEM public key from JWKS matching the token header's kid."""
     try:
-        header = jwt.get_unverified_header(token)
-        kid = header.get('kid')
         if not kid:
             return None
         now = int(time.time())
@@ -158,13 +128,19 @@ async def _get_public_key_from_jwks(token: str) -> Optional[str]:
             jwks = await _fetch_jwks()
             if jwks and isinstance(jwks.get('keys'), list):
                 _JWKS_CACHE["keys"] = jwks['keys']
+                _JWKS_CACHE["public_keys"] = {}
                 _JWKS_CACHE["cached_at"] = now
+        # Converted keys are kept per kid until the next JWKS refresh
+        public_keys = _JWKS_CACHE["public_keys"]
+        if kid in public_keys:
+            return public_keys[kid]
         keys = _JWKS_CACHE.get("keys") or []
         for jwk in keys:
             if jwk.get('kid') == kid:
                 try:
                     # Convert JWK to PEM-compatible key
                     public_key = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(jwk))
+                    public_keys[kid] = public_key
                     return public_key
                 except Exception as e:
                     logger.error("Failed converting JWK to key: %s", str(e))
@@ -211,7 +187,7 @@ async def verify_and_decode_jwt(token: str) -> dict:
 
     # 2) RS256 path using JWKS (or for any non-HS alg)
     try:
-        public_key = await _get_public_key_from_jwks(token)
+        public_key = await _get_public_key_from_jwks(unverified_header.get('kid'))
         if not public_key:
             raise HTTPException(status_code=401, detail="Unable to obtain public key for token")
         claims = jwt.decode(
@@ -238,14 +214,35 @@ async def verify_and_decode_jwt(token: str) -> dict:
         if os.getenv("DEBUG_TIMING") == "1":
             logger.info(f"TIMING jwt_verify: {(_time.perf_counter()-_t0):.4f}s")
 
+# Verified tokens: blake2b(token) -> (user_id, exp). The same JWT is presented on every
+# request until it expires, so signature verification only has to run once per token.
+_VERIFIED_TOKENS: "OrderedDict[bytes, tuple]" = OrderedDict()
+_VERIFIED_TOKENS_MAX = 4096
+
 async def extract_user_id_from_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Verify JWT and return the user id (sub)."""
     try:
         token = credentials.credentials if credentials else None
+        token_key = hashlib.blake2b(token.encode(), digest_size=16).digest() if token else None
+        cached = _VERIFIED_TOKENS.get(token_key) if token_key else None
+        if cached:
+            user_id, exp = cached
+            if exp > time.time():
+                _VERIFIED_TOKENS.move_to_end(token_key)
+                return user_id
+            _VERIFIED_TOKENS.pop(token_key, None)
+
         claims = await verify_and_decode_jwt(token)
         user_id = (claims.get('sub') or '').strip()
         if not user_id:
             raise HTTPException(status_code=401, detail="User ID not found in token")
+
+        # Only tokens with an expiry are cached, and never beyond it
+        exp = claims.get('exp')
+        if token_key and isinstance(exp, (int, float)):
+            _VERIFIED_TOKENS[token_key] = (user_id, exp)
+            if len(_VERIFIED_TOKENS) > _VERIFIED_TOKENS_MAX:
+                _VERIFIED_TOKENS.popitem(last=False)
         return user_id
     except HTTPException:
         raise
@@ -285,34 +282,62 @@ def get_admin_client() -> Optional[SupabaseClient]:
 # Pydantic models - imported from backend.models
 
 # Security middleware
-async def log_request(request: Request):
-    """Log all requests for security monitoring"""
-    client_ip = request.client.host if request.client else "unknown"
-    user_agent = request.headers.get("user-agent", "unknown")
-    
-    logger.info(f"Request: {request.method} {request.url.path} - IP: {client_ip} - UA: {user_agent}")
-    
-    # Simple anomaly detection
-    suspicious_patterns = [
-        r'<script',
-        r'javascript:',
-        r'\.\./\.\.',
-        r'union\s+select',
-        r'drop\s+table'
-    ]
-    
-    for pattern in suspicious_patterns:
-        if re.search(pattern, str(request.url), re.IGNORECASE):
-            logger.warning(f"Suspicious request pattern detected: {pattern} - IP: {client_ip}")
+# Simple anomaly detection patterns, merged into one alternation so each URL is scanned once
+_SUSPICIOUS_PATTERNS = (
+    r'<script',
+    r'javascript:',
+    r'\.\./\.\.',
+    r'union\s+select',
+    r'drop\s+table'
+)
+_SUSPICIOUS_RE = re.compile(
+    '|'.join(f'({pattern})' for pattern in _SUSPICIOUS_PATTERNS),
+    re.IGNORECASE
+)
+
+# High-frequency probe paths that are neither logged nor scanned
+_UNLOGGED_PATHS = frozenset({"/health", "/"})
+
+async def log_request(request: Request, client_ip: str):
+    """Check the request URL against suspicious patterns for security monitoring"""
+    match = _SUSPICIOUS_RE.search(str(request.url))
+    if match:
+        logger.warning(
+            "Suspicious request pattern detected: %s - IP: %s",
+            _SUSPICIOUS_PATTERNS[match.lastindex - 1], client_ip
+        )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up the worker's shared clients before serving requests and close them on shutdown."""
+    # Log which event loop implementation is serving requests (uvloop expected in production)
+    loop = asyncio.get_running_loop()
+    logger.info(f"Event loop: {type(loop).__module__}.{type(loop).__name__}")
+
+    # Shared Redis client (bounded pool); get_redis_client reconnects later if this fails
+    app.state._redis_client = await create_redis_client()
+    try:
+        yield
+    finally:
+        # Close the shared Redis connection pool and upstream HTTP sessions
+        redis_client = getattr(app.state, "_redis_client", None)
+        if redis_client is not None:
+            await redis_client.aclose()
+        await close_liveheats_client()
+        for client in (supabase_client, service_supabase_client):
+            if client is not None:
+                await client.close()
 
 app = FastAPI(
     title="FWT Events API",
+    lifespan=lifespan,
     version="1.0.0",
     docs_url="/docs" if os.getenv("ENVIRONMENT") == "development" else None,
-    redoc_url="/redoc" if os.getenv("ENVIRONMENT") == "development" else None
+    redoc_url="/redoc" if os.getenv("ENVIRONMENT") == "development" else None,
+    default_response_class=FastJSONResponse
 )
 
-# Add rate limiting
+# Add rate limiting (Redis-backed when REDIS_URL is set, shared across workers)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -342,28 +367,40 @@ app.add_middleware(
     expose_headers=["X-RateLimit-Limit", "X-RateLimit-Remaining"]
 )
 
+# Compress large JSON payloads (rankings, results, commentator exports)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Security: Add request logging middleware
 @app.middleware("http")
 async def security_middleware(request: Request, call_next):
-    start_time = time.time()
-    
-    # Log request
-    await log_request(request)
-    
+    start_time = time.perf_counter()
+    path = request.url.path
+    should_log = path not in _UNLOGGED_PATHS
+
+    if should_log:
+        client_ip = request.client.host if request.client else "unknown"
+        await log_request(request, client_ip)
+
     response = await call_next(request)
-    
+
     # Add security headers
     response.headers["X-Content-Type-Options"] = "nosniff"
     response.headers["X-Frame-Options"] = "DENY"
     response.headers["X-XSS-Protection"] = "1; mode=block"
     response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-    
-    # Log response time
-    process_time = time.time() - start_time
-    logger.info(f"Request processed in {process_time:.4f}s")
-    
+
+    # One log entry per request, including response time
+    if should_log:
+        logger.info(
+            "Request: %s %s - IP: %s - UA: %s - processed in %.4fs",
+            request.method, path, client_ip,
+            request.headers.get("user-agent", "unknown"),
+            time.perf_counter() - start_time
+        )
+
     return response
 
+
 # Store supabase_client in app state for routers to access
 app.state.supabase_client = supabase_client
 
@@ -389,9 +426,6 @@ app.include_router(event_access_router.router)
 app.include_router(video_router.router)
 app.include_router(livescoring_router.router)
 
-# Register events router limiter
-app.state.limiter = events_router.limiter
-
 # Store service client for activity router
 app.state.service_supabase_client = service_supabase_client
 
@@ -409,4 +443,11 @@ if __name__ == "__main__":
     import os
     port = int(os.getenv("PORT", 8000))
     print(f"Starting FastAPI server on http://localhost:{port}")
-    uvicorn.run("backend_api:app", host="0.0.0.0", port=port, reload=True) 
+    # uvloop + httptools ship with uvicorn[standard]; uvloop has no Windows build
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
+    if os.getenv("ENVIRONMENT") == "production":
+        # One event loop per process: scale CPU-bound work (JSON encoding, matching) across workers
+        workers = int(os.getenv("WORKERS", "4"))
+        uvicorn.run("backend_api:app", host="0.0.0.0", port=port, workers=workers, loop=loop, http="httptools")
+    else:
+        uvicorn.run("backend_api:app", host="0.0.0.0", port=port, reload=True, loop=loop, http="httptools") 
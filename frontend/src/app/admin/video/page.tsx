@@ -28,6 +28,7 @@ interface ParsedRider {
   state: string
   youtubeUrl: string
   youtubeTimestamp: number
+  normalized_name?: string
 }
 
 interface ParsedXmlData {
@@ -126,7 +127,7 @@ export default function VideoManagementPage() {
         getAccessToken,
         method: 'POST',
         body: {
-          riders: parseResult.data.riders.map(r => ({ name: r.name, bib: r.bib })),
+          riders: parseResult.data.riders.map(r => ({ name: r.name, bib: r.bib, normalized_name: r.normalized_name })),
           eventId: selectedEventId || 'unknown'
         }
       })
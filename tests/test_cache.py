@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Cache Helper Tests
+
+Covers backend/db/cache.py: refill_lock serializes refills of one Redis key
+within a worker, different keys don't wait on each other, and the per-key
+locks are dropped once nobody holds or waits for them. get_redis_client
+reconnects lazily, at most once per backoff, while Redis is unreachable.
+
+Usage:
+    pytest tests/test_cache.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.db import cache  # noqa: E402
+
+REDIS = object()  # refill_lock only checks that a client is configured
+
+
+async def hold(cache_key, log, redis_client=REDIS):
+    async with cache.refill_lock(redis_client, cache_key):
+        log.append(("enter", cache_key))
+        await asyncio.sleep(0.01)
+        log.append(("exit", cache_key))
+
+
+def test_same_key_is_serialized_and_released():
+    async def main():
+        log = []
+        await asyncio.gather(*[hold("seriesRankings:e1", log) for _ in range(3)])
+
+        assert log == [("enter", "seriesRankings:e1"), ("exit", "seriesRankings:e1")] * 3
+        assert cache._REFILL_LOCKS == {}
+
+    asyncio.run(main())
+
+
+def test_different_keys_do_not_wait_on_each_other():
+    async def main():
+        log = []
+        await asyncio.gather(hold("eventAthletes:e1", log), hold("eventAthletes:e2", log))
+
+        assert [step for step, _ in log] == ["enter", "enter", "exit", "exit"]
+        assert cache._REFILL_LOCKS == {}
+
+    asyncio.run(main())
+
+
+def test_lock_is_released_when_refill_fails():
+    async def main():
+        async def failing_refill():
+            async with cache.refill_lock(REDIS, "fullresults"):
+                raise RuntimeError("upstream failed")
+
+        results = await asyncio.gather(failing_refill(), hold("fullresults", []), return_exceptions=True)
+
+        assert isinstance(results[0], RuntimeError)
+        assert results[1] is None
+        assert cache._REFILL_LOCKS == {}
+
+    asyncio.run(main())
+
+
+def test_without_redis_nothing_is_locked():
+    async def main():
+        log = []
+        await asyncio.gather(*[hold("fullresults", log, redis_client=None) for _ in range(2)])
+
+        assert [step for step, _ in log] == ["enter", "enter", "exit", "exit"]
+        assert cache._REFILL_LOCKS == {}
+
+    asyncio.run(main())
+
+
+def test_redis_client_reconnects_after_backoff(monkeypatch):
+    attempts = []
+    clients = [None, "redis-client"]
+
+    async def fake_create_redis_client():
+        attempts.append(1)
+        return clients[len(attempts) - 1]
+
+    monkeypatch.setattr(cache, "create_redis_client", fake_create_redis_client)
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(_redis_client=None)))
+
+    async def main():
+        # Unreachable: one attempt, then none until the backoff has passed
+        assert await cache.get_redis_client(request) is None
+        assert await cache.get_redis_client(request) is None
+        assert len(attempts) == 1
+
+        request.app.state._redis_retry_at = 0.0
+        assert await cache.get_redis_client(request) == "redis-client"
+        assert await cache.get_redis_client(request) == "redis-client"
+        assert len(attempts) == 2
+
+    asyncio.run(main())
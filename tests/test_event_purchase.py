@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Batch Event Purchase Tests
+
+Covers _purchase_event_batch (POST /api/events/purchase-multiple) against an
+in-memory stand-in for SupabaseClient: credits are only kept when every step
+of the batch succeeds.
+
+Usage:
+    pytest tests/test_event_purchase.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.routers.event_access import _purchase_event_batch  # noqa: E402
+
+
+class FakeSupabase:
+    """
+    Minimal user_credits / user_event_access / credit_transactions store.
+
+    Every call yields to the event loop first, so concurrent purchases interleave
+    the way they would over the network. refuse_delete mimics an RLS policy that
+    filters out every row: the delete succeeds but removes nothing.
+    """
+
+    def __init__(self, credits=5, fail_on=None, refuse_delete=False):
+        self.credits = credits
+        self.access = []
+        self.transactions = []
+        self.fail_on = fail_on or set()
+        self.refuse_delete = refuse_delete
+        self.before_update = None
+
+    async def select(self, table, columns, filters, user_token=None):
+        await asyncio.sleep(0)
+        assert table == "user_credits"
+        return [{"credits": self.credits}]
+
+    async def insert(self, table, rows, user_token=None):
+        await asyncio.sleep(0)
+        if ("insert", table) in self.fail_on:
+            raise RuntimeError(f"insert into {table} failed")
+        if table == "user_event_access":
+            self.access.extend(row["event_id"] for row in rows)
+        else:
+            self.transactions.extend(rows)
+        return rows
+
+    async def update(self, table, data, filters, user_token=None):
+        await asyncio.sleep(0)
+        assert table == "user_credits"
+        if self.before_update:
+            self.before_update()
+        if filters.get("credits") != self.credits:
+            return []
+        self.credits = data["credits"]
+        return [{"credits": self.credits}]
+
+    async def delete(self, table, filters, user_token=None):
+        await asyncio.sleep(0)
+        assert table == "user_event_access"
+        if self.refuse_delete:
+            return []
+        removed = [event_id for event_id in self.access if event_id in filters["event_id"]]
+        self.access = [event_id for event_id in self.access if event_id not in filters["event_id"]]
+        return [{"event_id": event_id} for event_id in removed]
+
+
+async def purchase_async(supabase, event_ids, user_id="user-1"):
+    names = {event_id: None for event_id in event_ids}
+    return await _purchase_event_batch(supabase, user_id, event_ids, names, "token")
+
+
+def purchase(supabase, event_ids):
+    return asyncio.run(purchase_async(supabase, event_ids))
+
+
+def test_successful_batch_charges_one_credit_per_event():
+    supabase = FakeSupabase(credits=5)
+
+    assert purchase(supabase, ["e1", "e2"]) == 3
+    assert supabase.credits == 3
+    assert supabase.access == ["e1", "e2"]
+    assert [(t["credits_before"], t["credits_after"]) for t in supabase.transactions] == [(5, 4), (4, 3)]
+
+
+def test_insufficient_balance_grants_nothing():
+    supabase = FakeSupabase(credits=1)
+
+    assert purchase(supabase, ["e1", "e2"]) is None
+    assert supabase.credits == 1
+    assert supabase.access == []
+
+
+def test_concurrent_balance_change_grants_nothing():
+    supabase = FakeSupabase(credits=5)
+
+    def spend_elsewhere():
+        supabase.credits -= 4
+
+    supabase.before_update = spend_elsewhere
+
+    assert purchase(supabase, ["e1", "e2"]) is None
+    assert supabase.credits == 1
+    assert supabase.access == []
+
+
+def test_concurrent_purchases_cannot_share_one_credit():
+    supabase = FakeSupabase(credits=1, refuse_delete=True)
+
+    async def main():
+        return await asyncio.gather(purchase_async(supabase, ["e1"]), purchase_async(supabase, ["e2"]))
+
+    results = asyncio.run(main())
+
+    assert sorted(results, key=str) == [0, None]
+    assert supabase.credits == 0
+    assert len(supabase.access) == 1
+
+
+def test_failed_access_insert_refunds_credits():
+    supabase = FakeSupabase(credits=5, fail_on={("insert", "user_event_access")})
+
+    assert purchase(supabase, ["e1", "e2"]) is None
+    assert supabase.credits == 5
+    assert supabase.access == []
+    assert supabase.transactions == []
+
+
+def test_failed_transaction_log_revokes_access_and_refunds():
+    supabase = FakeSupabase(credits=5, fail_on={("insert", "credit_transactions")})
+
+    assert purchase(supabase, ["e1", "e2"]) is None
+    assert supabase.credits == 5
+    assert supabase.access == []
+
+
+def test_refused_revoke_keeps_the_paid_purchase():
+    supabase = FakeSupabase(credits=5, fail_on={("insert", "credit_transactions")}, refuse_delete=True)
+
+    # Access could not be taken back, so the credits are not handed back either
+    assert purchase(supabase, ["e1", "e2"]) == 3
+    assert supabase.credits == 3
+    assert supabase.access == ["e1", "e2"]
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Events Single-Flight Tests
+
+GET /api/events shares one upstream fetch between concurrent cache misses.
+These tests drive the endpoint in-process (no Redis, stubbed LiveHeats client)
+and check that the shared fetch survives the request that started it.
+
+Usage:
+    pytest tests/test_events_single_flight.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import backend_api  # noqa: E402
+from api.client import get_liveheats_client  # noqa: E402
+from backend.routers import events  # noqa: E402
+
+
+class FakeLiveheatsClient:
+    """Counts upstream calls; each one blocks until release is set."""
+
+    def __init__(self):
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def get_future_events(self):
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        return [{"id": "e1", "name": "Freeride World Tour 2025 Verbier", "date": "2025-03-20T00:00:00Z"}]
+
+    get_all_events = get_future_events
+
+
+def run_with_app(scenario):
+    """Run scenario(http_client, fake) against a fresh app state."""
+    app = backend_api.app
+
+    async def main():
+        fake = FakeLiveheatsClient()
+        app.dependency_overrides[events.extract_user_id_from_token] = lambda: "user-1"
+        app.dependency_overrides[get_liveheats_client] = lambda: fake
+        app.state._redis_client = None
+        app.state._redis_retry_at = float("inf")  # no reconnect attempts: run uncached
+        app.state._events_cache = {}
+        app.state._events_inflight = {}
+        events.limiter.enabled = False
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http_client:
+                await scenario(http_client, fake)
+        finally:
+            app.dependency_overrides.clear()
+            events.limiter.enabled = True
+
+    asyncio.run(main())
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def scenario(http_client, fake):
+        requests = [asyncio.create_task(http_client.get("/api/events")) for _ in range(10)]
+        await fake.started.wait()
+        fake.release.set()
+        responses = await asyncio.gather(*requests)
+
+        assert [r.status_code for r in responses] == [200] * 10
+        assert len({r.headers["etag"] for r in responses}) == 1
+        assert fake.calls == 1
+        assert backend_api.app.state._events_inflight == {}
+
+    run_with_app(scenario)
+
+
+def test_first_requester_disconnect_does_not_fail_waiters():
+    async def scenario(http_client, fake):
+        first = asyncio.create_task(http_client.get("/api/events"))
+        await fake.started.wait()
+        waiters = [asyncio.create_task(http_client.get("/api/events")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+
+        # The client that started the fetch hangs up mid-flight
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+
+        fake.release.set()
+        responses = await asyncio.gather(*waiters)
+
+        assert [r.status_code for r in responses] == [200] * 3
+        assert fake.calls == 1
+        # The shared fetch also filled the cache for later requests
+        assert (await http_client.get("/api/events")).status_code == 200
+        assert fake.calls == 1
+
+    run_with_app(scenario)
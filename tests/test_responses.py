@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Response Helper Tests
+
+Covers the shared cached-response helpers in backend/core/responses.py:
+ETag / If-None-Match handling and serving gzipped cache entries.
+
+Usage:
+    pytest tests/test_responses.py -v
+"""
+
+import gzip
+import sys
+from pathlib import Path
+
+from starlette.requests import Request
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.core.responses import (  # noqa: E402
+    accepts_gzip,
+    body_etag,
+    cached_gzip_json_response,
+    cached_json_response,
+    with_etag,
+)
+from backend.core.serialization import gzip_cache_value  # noqa: E402
+
+BODY = b'{"series_rankings":[' + b'{"athlete":"a","place":1},' * 4000 + b'{}]}'
+
+
+def make_request(**headers):
+    raw_headers = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw_headers})
+
+
+def test_with_etag_tags_response():
+    response = with_etag(make_request(), cached_json_response(BODY, 60))
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == body_etag(BODY)
+
+
+def test_with_etag_returns_304_for_matching_tag():
+    etag = body_etag(BODY)
+    response = with_etag(make_request(if_none_match=f'"other", W/{etag}'), cached_json_response(BODY, 60))
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+
+def test_with_etag_returns_304_for_wildcard():
+    response = with_etag(make_request(if_none_match="*"), cached_json_response(BODY, 60))
+
+    assert response.status_code == 304
+
+
+def test_with_etag_serves_body_for_stale_tag():
+    response = with_etag(make_request(if_none_match='"stale"'), cached_json_response(BODY, 60))
+
+    assert response.status_code == 200
+    assert response.body == BODY
+
+
+def test_accepts_gzip_parses_quality_values():
+    assert accepts_gzip(make_request(accept_encoding="gzip, deflate, br"))
+    assert accepts_gzip(make_request(accept_encoding="br;q=1.0, GZIP;q=0.5"))
+    assert accepts_gzip(make_request(accept_encoding="*"))
+    assert not accepts_gzip(make_request())
+    assert not accepts_gzip(make_request(accept_encoding="gzip;q=0"))
+    assert not accepts_gzip(make_request(accept_encoding="br, gzip;q=0.0"))
+    assert not accepts_gzip(make_request(accept_encoding="*, gzip;q=0"))
+    assert not accepts_gzip(make_request(accept_encoding="identity"))
+
+
+def test_gzipped_entry_is_sent_compressed_or_inflated():
+    stored = gzip_cache_value(BODY)
+    assert stored != BODY
+
+    compressed = cached_gzip_json_response(make_request(accept_encoding="gzip"), stored, 60)
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(compressed.body) == BODY
+
+    inflated = cached_gzip_json_response(make_request(accept_encoding="gzip;q=0"), stored, 60)
+    assert "content-encoding" not in inflated.headers
+    assert inflated.body == BODY
+
+
+def test_gzipped_entry_keeps_uncompressed_etag():
+    etag = body_etag(BODY)
+    stored = gzip_cache_value(BODY)
+
+    def serve_hit(request):
+        return with_etag(request, cached_gzip_json_response(request, stored, 60), etag)
+
+    miss = with_etag(make_request(), cached_json_response(BODY, 60), etag)
+    hit = serve_hit(make_request(accept_encoding="gzip"))
+    revalidated = serve_hit(make_request(accept_encoding="gzip", if_none_match=etag))
+
+    assert miss.headers["etag"] == hit.headers["etag"] == etag
+    assert revalidated.status_code == 304
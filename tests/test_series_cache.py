@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Series Cache Tests
+
+LiveheatsClient.get_series_by_years keeps the filtered series list in a
+process cache guarded by one lock per key. These tests stub the upstream
+fetch and check that concurrent misses share a single call.
+
+Usage:
+    pytest tests/test_series_cache.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api import client as liveheats  # noqa: E402
+
+
+class StubLiveheatsClient(liveheats.LiveheatsClient):
+    """Counts upstream fetches per organisation; each one yields to other tasks first."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = {}
+
+    async def _fetch_series_by_years(self, short_name, years):
+        self.calls[short_name] = self.calls.get(short_name, 0) + 1
+        await asyncio.sleep(0.01)
+        return [{"id": f"{short_name}-2025", "name": f"{short_name} Pro Tour 2025"}]
+
+
+def run(scenario):
+    liveheats._SERIES_CACHE.clear()
+    liveheats._SERIES_CACHE_LOCKS.clear()
+    try:
+        return asyncio.run(scenario(StubLiveheatsClient()))
+    finally:
+        liveheats._SERIES_CACHE.clear()
+        liveheats._SERIES_CACHE_LOCKS.clear()
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def scenario(client):
+        results = await asyncio.gather(*[client.get_series_by_years("fwtglobal") for _ in range(10)])
+
+        assert client.calls == {"fwtglobal": 1}
+        assert all(series == results[0] for series in results)
+        # Served from the process cache afterwards
+        await client.get_series_by_years("fwtglobal")
+        assert client.calls == {"fwtglobal": 1}
+
+    run(scenario)
+
+
+def test_keys_are_fetched_independently():
+    async def scenario(client):
+        await asyncio.gather(
+            client.get_series_by_years("fwtglobal"),
+            client.get_series_by_years("fwtglobal", range(2020, 2026)),
+            client.get_series_by_years("ifsa"),
+        )
+
+        assert client.calls == {"fwtglobal": 2, "ifsa": 1}
+        assert len(liveheats._SERIES_CACHE_LOCKS) == 3
+
+    run(scenario)
+
+
+def test_callers_get_their_own_list():
+    async def scenario(client):
+        first = await client.get_series_by_years("fwtglobal")
+        first.clear()
+
+        assert await client.get_series_by_years("fwtglobal") != []
+
+    run(scenario)
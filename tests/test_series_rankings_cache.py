@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Series Rankings Cache Tests
+
+GET /api/series/rankings/{event_id} refills its Redis entry under refill_lock.
+These tests drive the endpoint in-process against an in-memory Redis stand-in
+and a stubbed LiveHeats client, and check that concurrent misses share one
+rankings fetch and that hits carry the ETag of the miss.
+
+Usage:
+    pytest tests/test_series_rankings_cache.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import backend_api  # noqa: E402
+from api.client import get_liveheats_client  # noqa: E402
+from backend.routers import results  # noqa: E402
+
+
+class FakePipeline:
+    """Queues get / ttl / setex and runs them on execute."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def get(self, key):
+        self.ops.append((self.redis.get_now, key))
+        return self
+
+    def ttl(self, key):
+        self.ops.append((self.redis.ttl_now, key))
+        return self
+
+    def setex(self, key, ttl_seconds, value):
+        self.ops.append((self.redis.setex_now, (key, ttl_seconds, value)))
+        return self
+
+    async def execute(self):
+        await asyncio.sleep(0)
+        return [op(*args) if isinstance(args, tuple) else op(args) for op, args in self.ops]
+
+
+class FakeRedis:
+    """In-memory Redis with just what the endpoint uses; values are bytes, TTLs never run out."""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    def get_now(self, key):
+        return self.data.get(key)
+
+    def ttl_now(self, key):
+        return 3600 if key in self.data else -2
+
+    def setex_now(self, key, ttl_seconds, value):
+        self.data[key] = value if isinstance(value, bytes) else value.encode()
+        return True
+
+    async def get(self, key):
+        await asyncio.sleep(0)
+        return self.get_now(key)
+
+    async def setex(self, key, ttl_seconds, value):
+        await asyncio.sleep(0)
+        return self.setex_now(key, ttl_seconds, value)
+
+
+class FakeLiveheatsClient:
+    """Counts rankings fetches; each one takes a moment so misses overlap."""
+
+    def __init__(self):
+        self.ranking_calls = 0
+
+    async def get_event_athletes(self, event_id):
+        return {"event": {"name": "Verbier", "eventDivisions": [{"entries": [{"athlete": {"id": "a1"}}]}]}}
+
+    async def get_series_by_years(self, short_name, years, redis_client=None):
+        return [{"id": "s1", "name": "FWT Pro Tour 2025"}]
+
+    async def fetch_multiple_series(self, series_ids, athlete_ids, athlete_details=None):
+        self.ranking_calls += 1
+        await asyncio.sleep(0.01)
+        return [{"series_name": "FWT Pro Tour 2025", "divisions": {"Ski Men": []}}]
+
+
+def run_with_app(scenario):
+    """Run scenario(http_client, fake_client, fake_redis) against a fresh app state."""
+    app = backend_api.app
+
+    async def main():
+        fake_client = FakeLiveheatsClient()
+        fake_redis = FakeRedis()
+        app.dependency_overrides[results.extract_user_id_from_token] = lambda: "user-1"
+        app.dependency_overrides[get_liveheats_client] = lambda: fake_client
+        app.state._redis_client = fake_redis
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http_client:
+                await scenario(http_client, fake_client, fake_redis)
+        finally:
+            app.dependency_overrides.clear()
+            app.state._redis_client = None
+
+    asyncio.run(main())
+
+
+def test_concurrent_misses_share_one_rankings_fetch():
+    async def scenario(http_client, fake_client, fake_redis):
+        responses = await asyncio.gather(*[http_client.get("/api/series/rankings/e1") for _ in range(5)])
+
+        assert [r.status_code for r in responses] == [200] * 5
+        assert len({r.headers["etag"] for r in responses}) == 1
+        assert fake_client.ranking_calls == 1
+        assert {"seriesRankings:e1", "seriesRankingsEtag:e1", "eventAthletes:e1"} <= set(fake_redis.data)
+
+    run_with_app(scenario)
+
+
+def test_hit_revalidates_against_the_miss_etag():
+    async def scenario(http_client, fake_client, fake_redis):
+        miss = await http_client.get("/api/series/rankings/e1")
+        hit = await http_client.get("/api/series/rankings/e1", headers={"if-none-match": miss.headers["etag"]})
+
+        assert hit.status_code == 304
+        assert fake_client.ranking_calls == 1
+
+    run_with_app(scenario)